@@ -3,6 +3,7 @@ from browser_use.logging_config import setup_logging
 setup_logging()
 
 from browser_use.agent.prompts import SystemPrompt as SystemPrompt
+from browser_use.agent.runner import AgentRunner as AgentRunner
 from browser_use.agent.service import Agent as Agent
 from browser_use.agent.views import ActionModel as ActionModel
 from browser_use.agent.views import ActionResult as ActionResult
@@ -14,6 +15,7 @@ from browser_use.dom.service import DomService as DomService
 
 __all__ = [
 	'Agent',
+	'AgentRunner',
 	'Browser',
 	'BrowserConfig',
 	'Controller',
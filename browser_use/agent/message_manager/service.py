@@ -13,7 +13,11 @@ from langchain_core.messages import (
 )
 from langchain_openai import ChatOpenAI
 
-from browser_use.agent.message_manager.views import MessageHistory, MessageMetadata
+from browser_use.agent.message_manager.views import (
+	ManagedMessage,
+	MessageHistory,
+	MessageMetadata,
+)
 from browser_use.agent.prompts import AgentMessagePrompt, SystemPrompt
 from browser_use.agent.views import ActionResult, AgentOutput, AgentStepInfo
 from browser_use.browser.views import BrowserState
@@ -46,6 +50,10 @@ class MessageManager:
 		self.IMG_TOKENS = image_tokens
 		self.include_attributes = include_attributes
 		self.max_error_length = max_error_length
+		# Images of the last screenshot sent, kept after its state message is removed so that
+		# unchanged screenshots can bring them back into the conversation
+		self._last_screenshot_images: list[dict] = []
+		self._screenshot_message: Optional[ManagedMessage] = None
 
 		system_message = self.system_prompt_class(
 			self.action_descriptions,
@@ -110,6 +118,24 @@ class MessageManager:
 						self._add_message_with_tokens(msg)
 					result = None  # if result in history, we dont want to add it again
 
+		# An unchanged screenshot is left out for the last one sent, which stays in the
+		# conversation for as long as the screenshots do not change
+		screenshot_in_history = False
+		if state.screenshot and state.screenshot_unchanged and self._last_screenshot_images:
+			if self._screenshot_message is None:
+				self._add_message_with_tokens(
+					HumanMessage(
+						content=[
+							{'type': 'text', 'text': 'Screenshot of the last state:'},
+							*self._last_screenshot_images,
+						]
+					)
+				)
+				self._screenshot_message = self.history.messages[-1]
+			screenshot_in_history = True
+		else:
+			self._remove_screenshot_message()
+
 		# otherwise add state message and result to next message (which will not stay in memory)
 		state_message = AgentMessagePrompt(
 			state,
@@ -117,6 +143,7 @@ class MessageManager:
 			include_attributes=self.include_attributes,
 			max_error_length=self.max_error_length,
 			step_info=step_info,
+			screenshot_in_history=screenshot_in_history,
 		).get_user_message()
 		self._add_message_with_tokens(state_message)
 
@@ -125,8 +152,26 @@ class MessageManager:
 		if len(self.history.messages) > 2 and isinstance(
 			self.history.messages[-1].message, HumanMessage
 		):
+			content = self.history.messages[-1].message.content
 			self.history.remove_message()
 
+			if isinstance(content, list):
+				images = [
+					item for item in content if isinstance(item, dict) and 'image_url' in item
+				]
+				if images:
+					self._last_screenshot_images = images
+
+	def _remove_screenshot_message(self) -> None:
+		"""Remove the screenshot brought back for unchanged screenshots"""
+		if self._screenshot_message is None:
+			return
+		for index, managed_message in enumerate(self.history.messages):
+			if managed_message is self._screenshot_message:
+				self.history.remove_message(index)
+				break
+		self._screenshot_message = None
+
 	def add_model_output(self, model_output: AgentOutput) -> None:
 		"""Add model output as AI message"""
 		tool_calls = [
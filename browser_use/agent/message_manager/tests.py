@@ -236,3 +236,80 @@ def test_token_overflow_handling_with_real_flow(message_manager: MessageManager,
 
 
 # pytest -s browser_use/agent/message_manager/tests.py
+
+
+@pytest.fixture
+def vision_message_manager():
+	from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+	return MessageManager(
+		llm=FakeListChatModel(responses=[]),
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+		max_input_tokens=100000,
+	)
+
+
+def _vision_state(screenshot: bytes, unchanged: bool) -> BrowserState:
+	return BrowserState(
+		url='https://test.com',
+		title='Test Page',
+		element_tree=DOMElementNode(
+			tag_name='div', attributes={}, children=[], is_visible=True, parent=None, xpath='//div'
+		),
+		selector_map={},
+		tabs=[TabInfo(page_id=1, url='https://test.com', title='Test Page')],
+		screenshot=screenshot,
+		screenshot_unchanged=unchanged,
+	)
+
+
+def _images(messages) -> list[str]:
+	return [
+		item['image_url']['url']
+		for message in messages
+		if isinstance(message.content, list)
+		for item in message.content
+		if 'image_url' in item
+	]
+
+
+def test_unchanged_screenshot_refers_to_kept_image(vision_message_manager: MessageManager):
+	"""The image of an unchanged screenshot is left out only while the previous one is kept"""
+	manager = vision_message_manager
+
+	# Nothing was sent before, an unchanged screenshot still has to be attached
+	manager.add_state_message(_vision_state(b'first', unchanged=True))
+	assert len(_images(manager.get_messages())) == 1
+	manager._remove_last_state_message()
+	manager._add_message_with_tokens(AIMessage(content='step 1'))
+
+	# The previous image comes back after the last step, the state itself is text only
+	manager.add_state_message(_vision_state(b'first', unchanged=True))
+	messages = manager.get_messages()
+	assert len(_images(messages)) == 1
+	assert messages[-3].content == 'step 1' and _images(messages[-2:-1])
+	assert 'Screenshot unchanged' in messages[-1].content
+	manager._remove_last_state_message()
+	manager._add_message_with_tokens(AIMessage(content='step 2'))
+
+	# A changed screenshot replaces the kept one
+	manager.add_state_message(_vision_state(b'second', unchanged=False))
+	images = _images(manager.get_messages())
+	assert len(images) == 1 and images[0] != _images(messages)[0]
+
+
+def test_screenshots_leave_no_trace_while_they_change(vision_message_manager: MessageManager):
+	"""Without unchanged screenshots the history is the same as without the feature"""
+	manager = vision_message_manager
+
+	for step, screenshot in enumerate([b'first', b'second', b'third']):
+		messages_before = manager.get_messages()
+		manager.add_state_message(_vision_state(screenshot, unchanged=False))
+		assert len(_images(manager.get_messages())) == 1
+		manager._remove_last_state_message()
+		assert manager.get_messages() == messages_before
+		manager._add_message_with_tokens(AIMessage(content=f'step {step}'))
+
+	assert _images(manager.get_messages()) == []
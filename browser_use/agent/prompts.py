@@ -4,6 +4,7 @@ from typing import List, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from browser_use.agent.views import ActionResult, AgentStepInfo
+from browser_use.browser.screenshots import screenshot_to_data_url
 from browser_use.browser.views import BrowserState
 
 
@@ -154,8 +155,11 @@ class AgentMessagePrompt:
 		include_attributes: list[str] = [],
 		max_error_length: int = 400,
 		step_info: Optional[AgentStepInfo] = None,
+		screenshot_in_history: bool = False,
 	):
 		self.state = state
+		# Whether the previous screenshot is still part of the conversation
+		self.screenshot_in_history = screenshot_in_history
 		self.result = result
 		self.max_error_length = max_error_length
 		self.include_attributes = include_attributes
@@ -169,13 +173,24 @@ class AgentMessagePrompt:
 		else:
 			step_info_description = ''
 
+		elements_text = self.state.element_tree.clickable_elements_to_string(
+			include_attributes=self.include_attributes
+		)
+		if self.state.offscreen_above:
+			elements_text = (
+				f'... ~{self.state.offscreen_above} more interactive elements above - scroll up to see them\n'
+				+ elements_text
+			)
+		if self.state.offscreen_below:
+			elements_text += f'\n... ~{self.state.offscreen_below} more interactive elements below - scroll down to see them'
+
 		state_description = f"""
 {step_info_description}
 Current url: {self.state.url}
 Available tabs:
 {self.state.tabs}
 Interactive elements:
-{self.state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)}
+{elements_text}
         """
 
 		if self.result:
@@ -189,14 +204,16 @@ Interactive elements:
 					error = result.error[-self.max_error_length :]
 					state_description += f'\nAction error {i + 1}/{len(self.result)}: ...{error}'
 
-		if self.state.screenshot:
+		if self.state.screenshot and self.state.screenshot_unchanged and self.screenshot_in_history:
+			state_description += '\nScreenshot unchanged since the previous step.'
+		elif self.state.screenshot:
 			# Format message for vision model
 			return HumanMessage(
 				content=[
 					{'type': 'text', 'text': state_description},
 					{
 						'type': 'image_url',
-						'image_url': {'url': f'data:image/png;base64,{self.state.screenshot}'},
+						'image_url': {'url': screenshot_to_data_url(self.state.screenshot)},
 					},
 				]
 			)
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentHistoryList, AgentRunnerStats, AgentTaskResult
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRunner:
+	"""
+	Runs a stream of tasks with at most `max_concurrency` agents at a time, each in a browser
+	context leased from one shared Browser. Results are yielded as the tasks finish.
+
+	Tasks are read from the source only as agents become free, and agents wait for results to
+	be consumed, so neither side grows without bound. `stats` counts queued, running and finished
+	tasks and is logged every `stats_interval` seconds.
+
+	Contexts are closed after their task. `reuse_contexts` resets and pools them instead, which
+	keeps localStorage and IndexedDB (see BrowserContext.reset), so only use it for tasks that
+	may share origin storage.
+	"""
+
+	def __init__(
+		self,
+		llm: BaseChatModel,
+		browser: Browser | None = None,
+		max_concurrency: int = 4,
+		task_timeout: Optional[float] = None,
+		max_steps: int = 100,
+		context_config: BrowserContextConfig | None = None,
+		reuse_contexts: bool = False,
+		stats_interval: float = 60,
+		**agent_kwargs: Any,
+	):
+		self.llm = llm
+		self.injected_browser = browser is not None
+		self.browser = browser if browser is not None else Browser()
+		self.max_concurrency = max(max_concurrency, 1)
+		self.task_timeout = task_timeout
+		self.max_steps = max_steps
+		self.context_config = context_config
+		self.reuse_contexts = reuse_contexts
+		self.stats_interval = stats_interval
+		# A GIF per task would be written to the same path by every agent
+		agent_kwargs.setdefault('generate_gif', False)
+		self.agent_kwargs = agent_kwargs
+		self.stats = AgentRunnerStats(started_at=time.monotonic())
+
+	async def run(
+		self, tasks: Iterable[str] | AsyncIterable[str]
+	) -> AsyncIterator[AgentTaskResult]:
+		"""Run all tasks, yielding their results in the order they finish"""
+		self.stats = AgentRunnerStats(started_at=time.monotonic())
+		pending: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=self.max_concurrency)
+		results: asyncio.Queue[Optional[AgentTaskResult]] = asyncio.Queue(
+			maxsize=self.max_concurrency
+		)
+
+		await self.browser.warm_up()
+		feeder = asyncio.create_task(self._feed(tasks, pending))
+		workers = [
+			asyncio.create_task(self._work(pending, results)) for _ in range(self.max_concurrency)
+		]
+		reporter = asyncio.create_task(self._report())
+		try:
+			running_workers = len(workers)
+			while running_workers:
+				result = await results.get()
+				if result is None:
+					running_workers -= 1
+					continue
+				yield result
+			# Errors of the task source surface once the tasks read before it failed are done
+			await feeder
+			self._log_stats()
+		finally:
+			for task in (feeder, reporter, *workers):
+				task.cancel()
+			await asyncio.gather(feeder, reporter, *workers, return_exceptions=True)
+			if not self.injected_browser:
+				await self.browser.close()
+
+	async def _feed(
+		self, tasks: Iterable[str] | AsyncIterable[str], pending: asyncio.Queue[Optional[str]]
+	) -> None:
+		source_error: Optional[Exception] = None
+		try:
+			if isinstance(tasks, AsyncIterable):
+				async for task in tasks:
+					await self._submit(pending, task)
+			else:
+				for task in tasks:
+					await self._submit(pending, task)
+		except Exception as e:
+			source_error = e
+
+		# One stop marker per worker, the tasks queued before them still run
+		for _ in range(self.max_concurrency):
+			await pending.put(None)
+		if source_error is not None:
+			raise source_error
+
+	async def _submit(self, pending: asyncio.Queue[Optional[str]], task: str) -> None:
+		await pending.put(task)
+		self.stats.queued += 1
+
+	async def _work(
+		self,
+		pending: asyncio.Queue[Optional[str]],
+		results: asyncio.Queue[Optional[AgentTaskResult]],
+	) -> None:
+		while (task := await pending.get()) is not None:
+			self.stats.queued -= 1
+			self.stats.running += 1
+			try:
+				result = await self._run_task(task)
+			finally:
+				self.stats.running -= 1
+
+			if result.timed_out:
+				self.stats.timed_out += 1
+			elif result.error:
+				self.stats.failed += 1
+			else:
+				self.stats.completed += 1
+			await results.put(result)
+		await results.put(None)
+
+	async def _run_task(self, task: str) -> AgentTaskResult:
+		start_time = time.monotonic()
+		context: BrowserContext | None = None
+		agent: Agent | None = None
+		error = None
+		timed_out = False
+		finished = False
+		try:
+			context = await self.browser.lease_context(self.context_config)
+			agent = Agent(
+				task=task,
+				llm=self.llm,
+				browser=self.browser,
+				browser_context=context,
+				**self.agent_kwargs,
+			)
+			await asyncio.wait_for(agent.run(max_steps=self.max_steps), self.task_timeout)
+			finished = True
+		except asyncio.TimeoutError:
+			timed_out = True
+			error = f'Timed out after {self.task_timeout}s'
+			logger.warning(f'Task timed out after {self.task_timeout}s: {task}')
+		except Exception as e:
+			error = str(e)
+			logger.error(f'Task failed: {task}: {e}')
+		finally:
+			if context is not None:
+				# Contexts of failed, timed out or cancelled tasks are never reused
+				reuse = self.reuse_contexts and finished
+				try:
+					await self.browser.release_context(context, reuse=reuse)
+				except Exception as e:
+					logger.debug(f'Failed to release browser context: {e}')
+
+		history = agent.history if agent is not None else AgentHistoryList(history=[])
+		return AgentTaskResult(
+			task=task,
+			history=history,
+			error=error,
+			timed_out=timed_out,
+			duration=time.monotonic() - start_time,
+		)
+
+	async def _report(self) -> None:
+		while True:
+			await asyncio.sleep(self.stats_interval)
+			self._log_stats()
+
+	def _log_stats(self) -> None:
+		stats = self.stats
+		logger.info(
+			f'📊 Tasks: {stats.completed} completed, {stats.failed} failed, {stats.timed_out} timed out, '
+			f'{stats.running} running, {stats.queued} queued, '
+			f'{stats.throughput(time.monotonic()):.1f} tasks/min'
+		)
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+import browser_use.agent.runner as runner_module
+from browser_use.agent.runner import AgentRunner
+from browser_use.agent.views import AgentHistoryList
+
+
+class FakeBrowser:
+	"""Hands out contexts and records how they come back"""
+
+	def __init__(self):
+		self.leased = 0
+		self.released = []
+
+	async def warm_up(self):
+		pass
+
+	async def lease_context(self, config=None):
+		self.leased += 1
+		return object()
+
+	async def release_context(self, context, reuse=False):
+		self.released.append(reuse)
+
+	async def close(self):
+		pass
+
+
+class FakeAgent:
+	"""Tasks are `<seconds>` to sleep, or `fail`"""
+
+	running = 0
+	max_running = 0
+
+	def __init__(self, task, llm, browser, browser_context, **kwargs):
+		self.task = task
+		self.history = AgentHistoryList(history=[])
+		assert browser_context is not None and kwargs['generate_gif'] is False
+
+	async def run(self, max_steps):
+		FakeAgent.running += 1
+		FakeAgent.max_running = max(FakeAgent.max_running, FakeAgent.running)
+		try:
+			if self.task == 'fail':
+				raise RuntimeError('boom')
+			await asyncio.sleep(float(self.task))
+			return self.history
+		finally:
+			FakeAgent.running -= 1
+
+
+@pytest.fixture
+def fake_agent(monkeypatch):
+	FakeAgent.running = FakeAgent.max_running = 0
+	monkeypatch.setattr(runner_module, 'Agent', FakeAgent)
+	return FakeAgent
+
+
+async def test_tasks_run_bounded_and_stream_in_completion_order(fake_agent):
+	browser = FakeBrowser()
+	runner = AgentRunner(llm=None, browser=browser, max_concurrency=2, reuse_contexts=True)  # type: ignore
+
+	results = [result async for result in runner.run(['0.05', '0.01', '0.02', 'fail'])]
+
+	assert [result.task for result in results] == ['0.01', '0.02', 'fail', '0.05']
+	assert fake_agent.max_running == 2
+	assert results[2].error == 'boom'
+	assert runner.stats.completed == 3 and runner.stats.failed == 1
+	assert runner.stats.queued == 0 and runner.stats.running == 0
+	# Every leased context comes back, only clean ones are reused
+	assert browser.leased == 4 and sorted(browser.released) == [False, True, True, True]
+
+
+async def test_slow_tasks_time_out(fake_agent):
+	browser = FakeBrowser()
+	runner = AgentRunner(llm=None, browser=browser, max_concurrency=2, task_timeout=0.05)  # type: ignore
+
+	results = [result async for result in runner.run(['10', '0'])]
+
+	assert [(result.task, result.timed_out) for result in results] == [('0', False), ('10', True)]
+	assert runner.stats.timed_out == 1 and browser.released == [False, False]
+
+
+async def test_tasks_are_read_as_agents_become_free(fake_agent):
+	read = []
+
+	async def source():
+		for i in range(20):
+			read.append(i)
+			yield '0'
+
+	runner = AgentRunner(llm=None, browser=FakeBrowser(), max_concurrency=2)  # type: ignore
+	results = runner.run(source())
+	await results.__anext__()
+	# Running tasks plus the bounded queue, not the whole source
+	assert len(read) < 10
+	await results.aclose()
+
+
+async def test_contexts_are_closed_by_default_and_never_reused_after_cancellation(fake_agent):
+	browser = FakeBrowser()
+	results = [result async for result in AgentRunner(llm=None, browser=browser).run(['0'])]  # type: ignore
+	assert len(results) == 1 and browser.released == [False]
+
+	browser = FakeBrowser()
+	runner = AgentRunner(llm=None, browser=browser, max_concurrency=1, reuse_contexts=True)  # type: ignore
+	results = runner.run(['0', '10'])
+	await results.__anext__()
+	await asyncio.sleep(0.01)
+	# Stopping the run cancels the running task
+	await results.aclose()
+	assert browser.released == [True, False]
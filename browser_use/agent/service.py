@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import io
 import json
 import logging
@@ -40,7 +39,6 @@ from browser_use.controller.registry.views import ActionModel
 from browser_use.controller.service import Controller
 from browser_use.dom.history_tree_processor.service import (
 	DOMHistoryElement,
-	HistoryTreeProcessor,
 )
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import (
@@ -113,6 +111,7 @@ class Agent:
 		if browser_context:
 			self.browser_context = browser_context
 		elif self.browser:
+			# Replaced by a ready context from the browser's pool when the run starts
 			self.browser_context = BrowserContext(
 				browser=self.browser, config=self.browser.config.new_context_config
 			)
@@ -120,6 +119,7 @@ class Agent:
 			# If neither is provided, create both new
 			self.browser = Browser()
 			self.browser_context = BrowserContext(browser=self.browser)
+		self.leased_browser_context = False
 
 		self.system_prompt_class = system_prompt_class
 
@@ -344,6 +344,7 @@ class Agent:
 		"""Execute the task with maximum number of steps"""
 		try:
 			logger.info(f'🚀 Starting task: {self.task}')
+			await self._lease_browser_context()
 
 			self.telemetry.capture(
 				AgentRunTelemetryEvent(
@@ -381,7 +382,10 @@ class Agent:
 					steps=len(self.history.history),
 				)
 			)
-			if not self.injected_browser_context:
+			if self.leased_browser_context:
+				await self.browser.release_context(self.browser_context)  # type: ignore
+				self.leased_browser_context = False
+			elif not self.injected_browser_context:
 				await self.browser_context.close()
 
 			if not self.injected_browser and self.browser:
@@ -390,6 +394,18 @@ class Agent:
 			if self.generate_gif:
 				self.create_history_gif()
 
+	async def _lease_browser_context(self) -> None:
+		"""Take a ready context from the browser's pool instead of starting the own one cold"""
+		if (
+			self.injected_browser_context
+			or self.browser is None
+			or self.browser.config.context_pool_size <= 0
+			or self.browser_context.session is not None
+		):
+			return
+		self.browser_context = await self.browser.lease_context(self.browser_context.config)
+		self.leased_browser_context = True
+
 	def _too_many_failures(self) -> bool:
 		"""Check if we should stop due to too many failures"""
 		if self.consecutive_failures >= self.max_failures:
@@ -444,7 +460,7 @@ class Agent:
 		history: AgentHistoryList,
 		max_retries: int = 3,
 		skip_failures: bool = True,
-		delay_between_actions: float = 2.0,
+		delay_between_actions: Optional[float] = None,
 	) -> list[ActionResult]:
 		"""
 		Rerun a saved history of actions with error handling and retry logic.
@@ -453,11 +469,16 @@ class Agent:
 		        history: The history to replay
 		        max_retries: Maximum number of retries per action
 		        skip_failures: Whether to skip failed actions or stop execution
-		        delay_between_actions: Delay between actions in seconds
+		        delay_between_actions: Delay between actions in seconds, 2 by default and 0 when
+		                the browser context replays a HAR (see BrowserContextConfig.replay_har_path)
 
 		Returns:
 		        List of action results
 		"""
+		if delay_between_actions is None:
+			replaying = self.browser_context.config.replay_har_path is not None
+			delay_between_actions = 0 if replaying else 2.0
+
 		results = []
 
 		for i, history_item in enumerate(history.history):
@@ -525,8 +546,8 @@ class Agent:
 		await asyncio.sleep(delay)
 		return result
 
+	@staticmethod
 	async def _update_action_indices(
-		self,
 		historical_element: Optional[DOMHistoryElement],
 		action: ActionModel,  # Type this properly based on your action model
 		current_state: BrowserState,
@@ -538,9 +559,19 @@ class Agent:
 		if not historical_element or not current_state.element_tree:
 			return action
 
-		current_element = HistoryTreeProcessor.find_history_element_in_tree(
-			historical_element, current_state.element_tree
-		)
+		element_index = current_state.element_index
+		current_element = element_index.find(historical_element)
+		if current_element is None:
+			# The element may have moved, accept it if its attributes are unique on the page.
+			# Without attributes there is nothing that identifies it.
+			candidates = [
+				candidate
+				for candidate in element_index.find_by_attributes(historical_element)
+				if candidate.tag_name == historical_element.tag_name
+			]
+			if historical_element.attributes and len(candidates) == 1:
+				current_element = candidates[0]
+				logger.debug(f'Matched {historical_element.tag_name} by its attributes only')
 
 		if not current_element or current_element.highlight_index is None:
 			return None
@@ -654,9 +685,7 @@ class Agent:
 			if not item.state.screenshot:
 				continue
 
-			# Convert base64 screenshot to PIL Image
-			img_data = base64.b64decode(item.state.screenshot)
-			image = Image.open(io.BytesIO(img_data))
+			image = Image.open(io.BytesIO(item.state.screenshot))
 
 			if show_goals and item.model_output:
 				image = self._add_overlay_to_image(
@@ -688,15 +717,14 @@ class Agent:
 	def _create_task_frame(
 		self,
 		task: str,
-		first_screenshot: str,
+		first_screenshot: bytes,
 		title_font: ImageFont.FreeTypeFont,
 		regular_font: ImageFont.FreeTypeFont,
 		logo: Optional[Image.Image] = None,
 		line_spacing: float = 1.5,
 	) -> Image.Image:
 		"""Create initial frame showing the task."""
-		img_data = base64.b64decode(first_screenshot)
-		template = Image.open(io.BytesIO(img_data))
+		template = Image.open(io.BytesIO(first_screenshot))
 		image = Image.new('RGB', template.size, (0, 0, 0))
 		draw = ImageDraw.Draw(image)
 
@@ -869,7 +897,7 @@ class Agent:
 		return '\n'.join(lines)
 
 	def _create_frame(
-		self, screenshot: str, text: str, step_number: int, width: int = 1200, height: int = 800
+		self, screenshot: bytes, text: str, step_number: int, width: int = 1200, height: int = 800
 	) -> Image.Image:
 		"""Create a frame for the GIF with improved styling"""
 
@@ -877,7 +905,7 @@ class Agent:
 		frame = Image.new('RGB', (width, height), 'white')
 
 		# Load and resize screenshot
-		screenshot_img = Image.open(BytesIO(base64.b64decode(screenshot)))
+		screenshot_img = Image.open(BytesIO(screenshot))
 		screenshot_img.thumbnail((width - 40, height - 160))  # Leave space for text
 
 		# Calculate positions
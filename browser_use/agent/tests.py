@@ -1,5 +1,6 @@
 import pytest
 
+from browser_use.agent.service import Agent
 from browser_use.agent.views import (
 	ActionResult,
 	AgentBrain,
@@ -10,6 +11,7 @@ from browser_use.agent.views import (
 from browser_use.browser.views import BrowserState, BrowserStateHistory, TabInfo
 from browser_use.controller.registry.service import Registry
 from browser_use.controller.views import ClickElementAction, DoneAction, ExtractPageContentAction
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
 from browser_use.dom.views import DOMElementNode
 
 
@@ -19,7 +21,7 @@ def sample_browser_state():
 		url='https://example.com',
 		title='Example Page',
 		tabs=[TabInfo(url='https://example.com', title='Example Page', page_id=1)],
-		screenshot='screenshot1.png',
+		screenshot=b'screenshot1.png',
 		element_tree=DOMElementNode(
 			tag_name='root',
 			is_visible=True,
@@ -81,7 +83,7 @@ def sample_history(action_registry):
 				url='https://example.com',
 				title='Page 1',
 				tabs=[TabInfo(url='https://example.com', title='Page 1', page_id=1)],
-				screenshot='screenshot1.png',
+				screenshot=b'screenshot1.png',
 				interacted_element=[],
 			),
 		),
@@ -105,7 +107,7 @@ def sample_history(action_registry):
 				url='https://example.com/page2',
 				title='Page 2',
 				tabs=[TabInfo(url='https://example.com/page2', title='Page 2', page_id=2)],
-				screenshot='screenshot2.png',
+				screenshot=b'screenshot2.png',
 				interacted_element=[],
 			),
 		),
@@ -123,7 +125,7 @@ def sample_history(action_registry):
 				url='https://example.com/page2',
 				title='Page 2',
 				tabs=[TabInfo(url='https://example.com/page2', title='Page 2', page_id=2)],
-				screenshot='screenshot3.png',
+				screenshot=b'screenshot3.png',
 				interacted_element=[],
 			),
 		),
@@ -160,7 +162,7 @@ def test_urls(sample_history: AgentHistoryList):
 def test_all_screenshots(sample_history: AgentHistoryList):
 	screenshots = sample_history.screenshots()
 	assert len(screenshots) == 3
-	assert screenshots == ['screenshot1.png', 'screenshot2.png', 'screenshot3.png']
+	assert screenshots == [b'screenshot1.png', b'screenshot2.png', b'screenshot3.png']
 
 
 def test_all_model_outputs(sample_history: AgentHistoryList):
@@ -194,3 +196,46 @@ def test_action_creation(action_registry):
 
 # run this with:
 # pytest browser_use/agent/tests.py
+
+
+class FakeIndexedAction:
+	def __init__(self, index: int):
+		self.index = index
+
+	def get_index(self) -> int:
+		return self.index
+
+	def set_index(self, index: int) -> None:
+		self.index = index
+
+
+async def test_replay_does_not_match_other_tags_by_missing_attributes():
+	def element(tag_name: str, highlight_index: int | None = None) -> DOMElementNode:
+		return DOMElementNode(
+			tag_name=tag_name,
+			xpath=tag_name,
+			attributes={},
+			children=[],
+			is_visible=True,
+			parent=None,
+			highlight_index=highlight_index,
+		)
+
+	recorded_button = element('button', highlight_index=0)
+	recorded_body = element('body')
+	recorded_body.children = [recorded_button]
+	recorded_button.parent = recorded_body
+	historical_element = HistoryTreeProcessor.convert_dom_element_to_history_element(
+		recorded_button
+	)
+
+	# The only attribute-less highlighted element is a <span> somewhere else
+	span = element('span', highlight_index=3)
+	body = element('body')
+	body.children = [element('div')]
+	body.children[0].children = [span]  # type: ignore
+	span.parent = body.children[0]  # type: ignore
+	state = BrowserState(url='', title='', tabs=[], element_tree=body, selector_map={3: span})
+
+	action = FakeIndexedAction(0)
+	assert await Agent._update_action_indices(historical_element, action, state) is None  # type: ignore
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import json
 import traceback
 from dataclasses import dataclass
@@ -153,6 +154,9 @@ class AgentHistoryList(BaseModel):
 					h['model_output'] = None
 			if 'interacted_element' not in h['state']:
 				h['state']['interacted_element'] = None
+			# Screenshots are stored base64 encoded in JSON
+			if h['state'].get('screenshot'):
+				h['state']['screenshot'] = base64.b64decode(h['state']['screenshot'])
 		history = cls.model_validate(data)
 		return history
 
@@ -193,7 +197,7 @@ class AgentHistoryList(BaseModel):
 		"""Get all unique URLs from history"""
 		return [h.state.url for h in self.history if h.state.url]
 
-	def screenshots(self) -> list[str]:
+	def screenshots(self) -> list[bytes]:
 		"""Get all screenshots from history"""
 		return [h.state.screenshot for h in self.history if h.state.screenshot]
 
@@ -264,3 +268,35 @@ class AgentError:
 		if include_trace:
 			return f'{str(error)}\nStacktrace:\n{traceback.format_exc()}'
 		return f'{str(error)}'
+
+
+@dataclass
+class AgentTaskResult:
+	"""Outcome of one task of an AgentRunner, `history` holds the steps taken even on failure"""
+
+	task: str
+	history: AgentHistoryList
+	error: Optional[str] = None
+	timed_out: bool = False
+	duration: float = 0.0
+
+
+@dataclass
+class AgentRunnerStats:
+	"""Live counters of an AgentRunner"""
+
+	started_at: float
+	queued: int = 0
+	running: int = 0
+	completed: int = 0
+	failed: int = 0
+	timed_out: int = 0
+
+	@property
+	def finished(self) -> int:
+		return self.completed + self.failed + self.timed_out
+
+	def throughput(self, now: float) -> float:
+		"""Finished tasks per minute since the start"""
+		elapsed = now - self.started_at
+		return self.finished * 60 / elapsed if elapsed > 0 else 0.0
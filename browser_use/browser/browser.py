@@ -45,6 +45,15 @@ class BrowserConfig:
 
         physical_input_actions: {'click_element', 'input_text', 'scroll_down', 'scroll_up', 'send_keys'}
             Set of action names that should use physical input when enabled
+
+        context_pool_size: 0
+            Number of contexts with new_context_config to keep set up with a page open, ready to
+            be handed out by Browser.lease_context
+
+        browser_processes: 1
+            Number of browser processes to launch and spread contexts over, each new context goes
+            to the one with the fewest contexts. Crashed processes are replaced for new contexts.
+            Ignored when connecting to an existing browser (wss_url, chrome_instance_path).
     """
 
     headless: bool = False
@@ -67,13 +76,17 @@ class BrowserConfig:
         }
     )
 
+    context_pool_size: int = 0
+    browser_processes: int = 1
+
 
 class Browser:
     """
     Playwright browser on steroids.
 
     This is persistant browser factory that can spawn multiple browser contexts.
-    It is recommended to use only one instance of Browser per your application (RAM usage will grow otherwise).
+    It is recommended to use only one instance of Browser per your application (RAM usage will grow otherwise),
+    with `browser_processes` to use more than one browser process under many concurrent contexts.
     """
 
     def __init__(
@@ -83,7 +96,16 @@ class Browser:
         logger.debug('Initializing new browser')
         self.config = config
         self.playwright: Playwright | None = None
-        self.playwright_browser: PlaywrightBrowser | None = None
+        # Connected browser processes, contexts are spread over them
+        self.playwright_browsers: list[PlaywrightBrowser] = []
+        # Concurrent contexts must not launch a browser each
+        self._init_lock = asyncio.Lock()
+        # Rotates the order in which equally loaded browsers are picked
+        self._next_browser = 0
+
+        # Ready contexts for lease_context, and the tasks setting up more of them
+        self._context_pool: list[BrowserContext] = []
+        self._pool_refills: set[asyncio.Task] = set()
 
     async def new_context(
         self, config: BrowserContextConfig = BrowserContextConfig()
@@ -91,23 +113,119 @@ class Browser:
         """Create a browser context"""
         return BrowserContext(config=config, browser=self)
 
-    async def get_playwright_browser(self) -> PlaywrightBrowser:
-        """Get a browser context"""
-        if self.playwright_browser is None:
-            return await self._init()
+    async def lease_context(self, config: BrowserContextConfig | None = None) -> BrowserContext:
+        """
+        Take a ready context from the pool, or create one if the pool is empty or `config` differs
+        from `new_context_config`. Hand it back with `release_context`.
+        """
+        config = config or self.config.new_context_config
+        if config != self.config.new_context_config:
+            return BrowserContext(config=config, browser=self)
+
+        context = self._context_pool.pop() if self._context_pool else None
+        self._refill_context_pool()
+        return context or BrowserContext(config=config, browser=self)
+
+    async def release_context(self, context: BrowserContext, reuse: bool = False) -> None:
+        """
+        Close a leased context. With `reuse`, it is reset and put back into the pool instead,
+        if the pool has room for it (see BrowserContext.reset for what is cleared).
+        """
+        if (
+            reuse
+            and context.session is not None
+            and context.config == self.config.new_context_config
+            and len(self._context_pool) < self.config.context_pool_size
+        ):
+            try:
+                await context.reset()
+                self._context_pool.append(context)
+                return
+            except Exception as e:
+                logger.debug(f'Failed to reset browser context, closing it: {e}')
 
-        return self.playwright_browser
+        await context.close()
+        self._refill_context_pool()
 
-    async def _init(self):
-        """Initialize the browser session"""
-        playwright = await async_playwright().start()
-        browser = await self._setup_browser(playwright)
+    async def warm_up(self) -> None:
+        """Fill the context pool and wait until its contexts are ready"""
+        self._refill_context_pool()
+        await asyncio.gather(*self._pool_refills, return_exceptions=True)
 
-        self.playwright = playwright
-        self.playwright_browser = browser
+    def _refill_context_pool(self) -> None:
+        missing = self.config.context_pool_size - len(self._context_pool) - len(self._pool_refills)
+        for _ in range(missing):
+            task = asyncio.create_task(self._warm_context())
+            self._pool_refills.add(task)
+            task.add_done_callback(self._pool_refills.discard)
+
+    async def _warm_context(self) -> None:
+        context = BrowserContext(config=self.config.new_context_config, browser=self)
+        try:
+            # Creates the Playwright context, runs its setup and opens the first page
+            await context.get_session()
+        except Exception as e:
+            logger.warning(f'Failed to prepare browser context for the pool: {e}')
+            await context.close()
+            return
+        if len(self._context_pool) >= self.config.context_pool_size:
+            # Filled up by reused contexts meanwhile
+            await context.close()
+            return
+        self._context_pool.append(context)
+
+    @property
+    def playwright_browser(self) -> PlaywrightBrowser | None:
+        """The first browser process"""
+        return self.playwright_browsers[0] if self.playwright_browsers else None
+
+    async def get_playwright_browser(self) -> PlaywrightBrowser:
+        """Get the browser process with the fewest contexts for a new context"""
+        async with self._init_lock:
+            if len(self.playwright_browsers) < self._browser_process_count():
+                await self._init()
+
+        browsers = self.playwright_browsers
+        if not browsers:
+            raise RuntimeError('No browser process is running')
+        # Contexts created in a burst all see the same counts, ties are spread round-robin
+        self._next_browser = (self._next_browser + 1) % len(browsers)
+        rotated = browsers[self._next_browser :] + browsers[: self._next_browser]
+        return min(rotated, key=lambda browser: len(browser.contexts))
+
+    def _browser_process_count(self) -> int:
+        if self.config.wss_url or self.config.chrome_instance_path:
+            return 1
+        return max(self.config.browser_processes, 1)
+
+    async def _init(self):
+        """Initialize the browser session, launching the missing browser processes"""
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        playwright = self.playwright
+
+        missing = self._browser_process_count() - len(self.playwright_browsers)
+        results = await asyncio.gather(
+            *(self._setup_browser(playwright) for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                if not self.playwright_browsers:
+                    raise result
+                logger.warning(
+                    f'Failed to launch a browser process, continuing with the others: {result}'
+                )
+                continue
+            result.on('disconnected', self._on_browser_disconnected)
+            self.playwright_browsers.append(result)
 
         return self.playwright_browser
 
+    def _on_browser_disconnected(self, browser: PlaywrightBrowser) -> None:
+        if browser in self.playwright_browsers:
+            logger.warning('Browser process disconnected, new contexts go to the remaining ones')
+            self.playwright_browsers.remove(browser)
+
     async def _setup_browser(self, playwright: Playwright) -> PlaywrightBrowser:
         """Sets up and returns a Playwright Browser instance with anti-detection measures."""
         if self.config.wss_url:
@@ -195,20 +313,26 @@ class Browser:
     async def close(self):
         """Close the browser instance"""
         try:
-            if self.playwright_browser:
-                await self.playwright_browser.close()
+            for task in list(self._pool_refills):
+                task.cancel()
+            await asyncio.gather(*self._pool_refills, return_exceptions=True)
+            pool, self._context_pool = self._context_pool, []
+            await asyncio.gather(*(context.close() for context in pool), return_exceptions=True)
+
+            browsers, self.playwright_browsers = self.playwright_browsers, []
+            await asyncio.gather(*(browser.close() for browser in browsers), return_exceptions=True)
             if self.playwright:
                 await self.playwright.stop()
         except Exception as e:
             logger.debug(f'Failed to close browser properly: {e}')
         finally:
-            self.playwright_browser = None
+            self.playwright_browsers = []
             self.playwright = None
 
     def __del__(self):
         """Async cleanup when object is destroyed"""
         try:
-            if self.playwright_browser or self.playwright:
+            if self.playwright_browsers or self.playwright:
                 loop = asyncio.get_running_loop()
                 if loop.is_running():
                     loop.create_task(self.close())
@@ -3,7 +3,6 @@ Playwright browser on steroids.
 """
 
 import asyncio
-import base64
 import json
 import logging
 import os
@@ -23,10 +22,20 @@ from playwright.async_api import (
 	Page,
 )
 
+from browser_use.browser.http_cache import HttpCache, get_http_cache
 from browser_use.browser.input.controller import PhysicalInputController
+from browser_use.browser.network import NetworkTracker, RequestBlocker
+from browser_use.browser.screenshots import (
+	ScreenshotFormat,
+	hash_distance,
+	perceptual_hash,
+	process_screenshot,
+	screenshot_mime_type,
+	screenshot_to_base64,
+)
 from browser_use.browser.views import BrowserError, BrowserState, TabInfo
 from browser_use.dom.service import DomService
-from browser_use.dom.views import DOMElementNode, SelectorMap
+from browser_use.dom.views import DOMElementNode, HighlightBox, SelectorMap
 from browser_use.utils import time_execution_sync
 
 if TYPE_CHECKING:
@@ -78,6 +87,93 @@ class BrowserContextConfig:
 
 			trace_path: None
 					Path to save trace files. It will auto name the file with the TRACE_PATH/{context_id}.zip
+
+			har_path: None
+					Path to record the network traffic of the context to, as HAR_PATH/{context_id}.har
+					(see `BrowserContext.har_file`). Written when the context is closed.
+
+			replay_har_path: None
+					HAR file to serve all requests from, e.g. one recorded with har_path. Requests that
+					are not in it are aborted, nothing goes to the network, and page loads only wait for
+					the load event. Actions do not wait wait_between_actions for each other, and
+					Agent.rerun_history skips its delay between steps by default.
+
+			incremental_dom_snapshots: False
+					Keep the DOM extractor alive in the page between steps and only re-extract the
+					subtrees that changed (tracked with a MutationObserver)
+
+			flat_dom_format: False
+					Transfer the DOM tree from the page as flat parallel arrays instead of one nested
+					object. Smaller to serialize and decoded without recursion on large pages.
+
+			viewport_expansion: None
+					Only extract elements within this many viewports above and below the current
+					scroll position. Interactive elements further away are summarized as counts.
+					None extracts the whole page.
+
+			prune_invisible_elements: False
+					Drop subtrees without any visible or interactive element (closed menus, hidden
+					modals, collapsed sections) in the page before they are serialized.
+
+			per_frame_extraction: False
+					Extract every frame of the page concurrently, including cross-origin iframes
+					that the in-page walk cannot enter, and attach them under their <iframe> nodes.
+					Ignored with incremental_dom_snapshots.
+
+			json_dom_transport: False
+					Send the extracted DOM from the page as one JSON string and decode it with orjson
+					(standard library json if orjson is not installed). Much faster than Playwright's
+					object serialization on large pages.
+
+			highlights_on_screenshot: False
+					Draw the highlight boxes and index labels onto the screenshot instead of into the
+					page, so the page's layout is never touched and no cleanup is needed between steps.
+
+			screenshot_format: 'png'
+					Encoding of screenshots: 'png', 'jpeg' or 'webp'. Lossy formats are several times
+					smaller to keep in memory and to send to the LLM.
+
+			screenshot_quality: None
+					Quality from 0 to 100 for jpeg and webp screenshots, the encoder's default if None.
+
+			screenshot_max_size: None
+					Downscale screenshots so that their longest side is at most this many pixels.
+
+			skip_unchanged_screenshots: False
+					Compare each screenshot with the last one sent by perceptual hash, and tell the
+					LLM that the screenshot is unchanged instead of sending a near-identical image.
+
+			unchanged_screenshot_max_distance: 0
+					Number of cells of the perceptual hash's 96x96 grid that may change visibly while a
+					screenshot still counts as unchanged. At 0 any visible change, however small, sends
+					the new screenshot.
+
+			block_trackers: False
+					Abort requests to known analytics, tracking and ad hosts.
+
+			block_media: False
+					Abort audio and video requests.
+
+			stub_images: False
+					Answer image requests with a transparent 1x1 pixel, so screenshots lose the images.
+					Only images sized by width/height attributes or CSS keep their boxes. Images sized
+					by their own dimensions collapse to 1x1, which can move the elements around them,
+					so only use it on pages that size their images.
+
+			stub_fonts: False
+					Answer web font requests with an empty font, text falls back to other fonts.
+
+			Counts of blocked requests are kept in `BrowserContext.request_blocker.blocked`.
+			block_media, stub_images and stub_fonts route every request through Python.
+
+			http_cache_dir: None
+					Serve scripts, stylesheets, fonts and images from an on-disk cache in this directory,
+					shared by all contexts (and processes) that use it. Hit and miss counts are kept in
+					`BrowserContext.http_cache.stats`.
+
+			http_cache_max_size: 536870912
+					Size limit of the cache directory in bytes, shared by all processes that use it.
+					Least recently used entries are evicted.
 	"""
 
 	cookies_file: str | None = None
@@ -95,6 +191,27 @@ class BrowserContextConfig:
 
 	save_recording_path: str | None = None
 	trace_path: str | None = None
+	har_path: str | None = None
+	replay_har_path: str | None = None
+
+	incremental_dom_snapshots: bool = False
+	flat_dom_format: bool = False
+	viewport_expansion: float | None = None
+	prune_invisible_elements: bool = False
+	per_frame_extraction: bool = False
+	json_dom_transport: bool = False
+	highlights_on_screenshot: bool = False
+	screenshot_format: ScreenshotFormat = 'png'
+	screenshot_quality: int | None = None
+	screenshot_max_size: int | None = None
+	skip_unchanged_screenshots: bool = False
+	unchanged_screenshot_max_distance: int = 0
+	block_trackers: bool = False
+	block_media: bool = False
+	stub_images: bool = False
+	stub_fonts: bool = False
+	http_cache_dir: str | None = None
+	http_cache_max_size: int = 512 * 1024 * 1024
 
 
 @dataclass
@@ -102,6 +219,9 @@ class BrowserSession:
 	context: PlaywrightBrowserContext
 	current_page: Page
 	cached_state: BrowserState
+	dom_services: dict[Page, DomService] = field(default_factory=dict)
+	# Perceptual hash of the last screenshot that was not reported as unchanged
+	screenshot_hash: Optional[bytes] = None
 
 
 class BrowserContext:
@@ -118,6 +238,17 @@ class BrowserContext:
 
 			# Initialize these as None - they'll be set up when needed
 			self.session: BrowserSession | None = None
+			self._network_tracker = NetworkTracker()
+			self.request_blocker = RequestBlocker(
+					block_trackers=config.block_trackers,
+					block_media=config.block_media,
+					stub_images=config.stub_images,
+					stub_fonts=config.stub_fonts,
+			)
+			self.http_cache: Optional[HttpCache] = None
+			self.har_file: Optional[str] = None
+			if config.har_path:
+					self.har_file = os.path.join(config.har_path, f'{self.context_id}.har')
 			
 			# Initialize physical input controller if enabled
 			self.physical_input: Optional[PhysicalInputController] = None
@@ -155,6 +286,8 @@ class BrowserContext:
 
 					try:
 							await self.session.context.close()
+							if self.har_file:
+									logger.info(f'Saved network traffic to {self.har_file}')
 					except Exception as e:
 							logger.debug(f'Failed to close context: {e}')
 			finally:
@@ -179,10 +312,23 @@ class BrowserContext:
 			playwright_browser = await self.browser.get_playwright_browser()
 
 			context = await self._create_context(playwright_browser)
+			# Before the first page, so that its requests are tracked too
+			self._network_tracker.attach(context)
 			page = await context.new_page()
 
+			self.session = BrowserSession(
+					context=context,
+					current_page=page,
+					cached_state=await self._initial_state(page),
+			)
+
+			await self._add_new_page_listener(context)
+
+			return self.session
+
+	async def _initial_state(self, page: Page) -> BrowserState:
 			# Instead of calling _update_state(), create an empty initial state
-			initial_state = BrowserState(
+			return BrowserState(
 					element_tree=DOMElementNode(
 							tag_name='root',
 							is_visible=True,
@@ -198,15 +344,31 @@ class BrowserContext:
 					tabs=[],
 			)
 
-			self.session = BrowserSession(
-					context=context,
-					current_page=page,
-					cached_state=initial_state,
-			)
+	async def reset(self):
+			"""
+			Clear cookies, permissions and tabs, so that the context can be handed to another task
+			without setting it up again. Storage of visited origins (localStorage, IndexedDB) is
+			not cleared, close the context instead where that matters.
+			"""
+			session = await self.get_session()
+			context = session.context
 
-			await self._add_new_page_listener(context)
+			await context.clear_cookies()
+			await context.clear_permissions()
+			await self._load_cookies(context)
 
-			return self.session
+			old_pages = context.pages
+			page = await context.new_page()
+			await asyncio.gather(
+					*(old_page.close() for old_page in old_pages), return_exceptions=True
+			)
+
+			session.current_page = page
+			session.cached_state = await self._initial_state(page)
+			session.dom_services.clear()
+			session.screenshot_hash = None
+			if hasattr(self, 'current_state'):
+					del self.current_state
 
 	async def _add_new_page_listener(self, context: PlaywrightBrowserContext):
 			async def on_page(page: Page):
@@ -228,6 +390,14 @@ class BrowserContext:
 			session = await self.get_session()
 			return session.current_page
 
+	async def _load_cookies(self, context: PlaywrightBrowserContext):
+			"""Load cookies if they exist"""
+			if self.config.cookies_file and os.path.exists(self.config.cookies_file):
+					with open(self.config.cookies_file, 'r') as f:
+							cookies = json.load(f)
+							logger.info(f'Loaded {len(cookies)} cookies from {self.config.cookies_file}')
+							await context.add_cookies(cookies)
+
 	async def _create_context(self, browser: PlaywrightBrowser):
 			"""Creates a new browser context with anti-detection measures and loads cookies if available."""
 			if self.browser.config.chrome_instance_path and len(browser.contexts) > 0:
@@ -246,17 +416,29 @@ class BrowserContext:
 							bypass_csp=self.config.disable_security,
 							ignore_https_errors=self.config.disable_security,
 							record_video_dir=self.config.save_recording_path,
+							# Only what routing from the HAR needs
+							record_har_path=self.har_file,
+							record_har_mode='minimal' if self.har_file else None,
 					)
 
 			if self.config.trace_path:
 					await context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
-			# Load cookies if they exist
-			if self.config.cookies_file and os.path.exists(self.config.cookies_file):
-					with open(self.config.cookies_file, 'r') as f:
-							cookies = json.load(f)
-							logger.info(f'Loaded {len(cookies)} cookies from {self.config.cookies_file}')
-							await context.add_cookies(cookies)
+			await self._load_cookies(context)
+
+			# Routes registered later are matched first: blocked requests never reach the cache
+			if self.config.http_cache_dir:
+					self.http_cache = get_http_cache(
+							self.config.http_cache_dir, self.config.http_cache_max_size
+					)
+					await self.http_cache.attach(context)
+			if self.request_blocker.enabled:
+					await self.request_blocker.attach(context)
+			if self.config.replay_har_path:
+					await context.route_from_har(self.config.replay_har_path, not_found='abort')
+
+			# Register the DOM extractor once, every step only calls it
+			await context.add_init_script(DomService.get_install_script())
 
 			# Expose anti-detection scripts
 			await context.add_init_script(
@@ -293,183 +475,42 @@ class BrowserContext:
 
 	async def _wait_for_stable_network(self):
 		page = await self.get_current_page()
+		network = self._network_tracker
 
-		pending_requests = set()
-		last_activity = asyncio.get_event_loop().time()
-
-		# Define relevant resource types and content types
-		RELEVANT_RESOURCE_TYPES = {
-			'document',
-			'stylesheet',
-			'image',
-			'font',
-			'script',
-			'iframe',
-		}
-
-		RELEVANT_CONTENT_TYPES = {
-			'text/html',
-			'text/css',
-			'application/javascript',
-			'image/',
-			'font/',
-			'application/json',
-		}
-
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
-		async def on_request(request):
-			# Filter by resource type
-			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
-				return
-
-			# Filter out streaming, websocket, and other real-time requests
-			if request.resource_type in {
-				'websocket',
-				'media',
-				'eventsource',
-				'manifest',
-				'other',
-			}:
-				return
-
-			# Filter out by URL patterns
-			url = request.url.lower()
-			if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
-				return
-
-			# Filter out data URLs and blob URLs
-			if url.startswith(('data:', 'blob:')):
-				return
-
-			# Filter out requests with certain headers
-			headers = request.headers
-			if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in [
-				'video',
-				'audio',
-			]:
-				return
-
-			nonlocal last_activity
-			pending_requests.add(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request started: {request.url} ({request.resource_type})')
-
-		async def on_response(response):
-			request = response.request
-			if request not in pending_requests:
-				return
-
-			# Filter by content type if available
-			content_type = response.headers.get('content-type', '').lower()
-
-			# Skip if content type indicates streaming or real-time data
-			if any(
-				t in content_type
-				for t in [
-					'streaming',
-					'video',
-					'audio',
-					'webm',
-					'mp4',
-					'event-stream',
-					'websocket',
-					'protobuf',
-				]
-			):
-				pending_requests.remove(request)
-				return
-
-			# Only process relevant content types
-			if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
-				pending_requests.remove(request)
-				return
-
-			# Skip if response is too large (likely not essential for page load)
-			content_length = response.headers.get('content-length')
-			if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB
-				pending_requests.remove(request)
-				return
-
-			nonlocal last_activity
-			pending_requests.remove(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request resolved: {request.url} ({content_type})')
-
-		# Attach event listeners
-		page.on('request', on_request)
-		page.on('response', on_response)
-
-		try:
-			# Wait for idle time
-			start_time = asyncio.get_event_loop().time()
-			while True:
-				await asyncio.sleep(0.1)
-				now = asyncio.get_event_loop().time()
-				if (
-					len(pending_requests) == 0
-					and (now - last_activity) >= self.config.wait_for_network_idle_page_load_time
-				):
-					break
-				if now - start_time > self.config.maximum_wait_page_load_time:
-					logger.debug(
-						f'Network timeout after {self.config.maximum_wait_page_load_time}s with {len(pending_requests)} '
-						f'pending requests: {[r.url for r in pending_requests]}'
-					)
-					break
-
-		finally:
-			# Clean up event listeners
-			page.remove_listener('request', on_request)
-			page.remove_listener('response', on_response)
+		idle = await network.wait_for_idle(
+			page,
+			idle_time=self.config.wait_for_network_idle_page_load_time,
+			timeout=self.config.maximum_wait_page_load_time,
+		)
+		if not idle:
+			pending_requests = network.pending_requests(page)
+			logger.debug(
+				f'Network timeout after {self.config.maximum_wait_page_load_time}s with {len(pending_requests)} '
+				f'pending requests: {[r.url for r in pending_requests]}'
+			)
+			return
 
 		logger.debug(
 			f'Network stabilized for {self.config.wait_for_network_idle_page_load_time} seconds'
 		)
 
+	async def _wait_for_load_event(self):
+		page = await self.get_current_page()
+		try:
+			await page.wait_for_load_state(timeout=self.config.maximum_wait_page_load_time * 1000)
+		except Exception:
+			logger.warning('Page load failed, continuing...')
+
 	async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
 		"""
 		Ensures page is fully loaded before continuing.
 		Waits for either network to be idle or minimum WAIT_TIME, whichever is longer.
 		"""
+		if self.config.replay_har_path:
+			# Responses come from a local file, there is nothing to wait for after the load event
+			await self._wait_for_load_event()
+			return
+
 		# Start timing
 		start_time = time.time()
 
@@ -547,48 +588,99 @@ class BrowserContext:
 		session = await self.get_session()
 		session.cached_state = await self._update_state(use_vision=use_vision)
 
+		if self.config.skip_unchanged_screenshots and session.cached_state.screenshot:
+			await self._check_screenshot_unchanged(session, session.cached_state)
+
 		# Save cookies if a file is specified
 		if self.config.cookies_file:
 			asyncio.create_task(self.save_cookies())
 
 		return session.cached_state
 
+	async def _check_screenshot_unchanged(
+		self, session: BrowserSession, state: BrowserState
+	) -> None:
+		assert state.screenshot is not None
+		screenshot_hash = await asyncio.to_thread(perceptual_hash, state.screenshot)
+		state.screenshot_unchanged = (
+			session.screenshot_hash is not None
+			and hash_distance(screenshot_hash, session.screenshot_hash)
+			<= self.config.unchanged_screenshot_max_distance
+		)
+		# Compared against the last screenshot sent, so that small changes cannot add up unseen
+		if not state.screenshot_unchanged:
+			session.screenshot_hash = screenshot_hash
+
 	async def _update_state(self, use_vision: bool = False) -> BrowserState:
 		"""Update and return state."""
 		session = await self.get_session()
 
-		# Check if current page is still valid, if not switch to another available page
-		try:
-			page = await self.get_current_page()
-			# Test if page is still accessible
-			await page.evaluate('1')
-		except Exception as e:
-			logger.debug(f'Current page is no longer accessible: {str(e)}')
+		# Check if current page is still valid, if not switch to another available page.
+		# Anything else that broke the page surfaces from the extraction below.
+		page = await self.get_current_page()
+		if page.is_closed():
+			logger.debug('Current page is no longer accessible')
 			# Get all available pages
-			pages = session.context.pages
+			pages = [p for p in session.context.pages if not p.is_closed()]
 			if pages:
 				session.current_page = pages[-1]
 				page = session.current_page
-				logger.debug(f'Switched to page: {await page.title()}')
+				logger.debug(f'Switched to page: {page.url}')
 			else:
 				raise BrowserError('Browser closed: no valid pages available')
 
 		try:
-			await self.remove_highlights()
-			dom_service = DomService(page)
-			content = await dom_service.get_clickable_elements()
+			dom_service = self._get_dom_service(session, page)
+			highlights_on_screenshot = self.config.highlights_on_screenshot
+			# One call to the page removes the old highlights, extracts the DOM and reads the
+			# title and scroll position. The other tabs are asked for their titles meanwhile.
+			extraction = dom_service.get_clickable_elements(
+				highlight_elements=not highlights_on_screenshot,
+				incremental=self.config.incremental_dom_snapshots,
+				flat=self.config.flat_dom_format,
+				viewport_expansion=self.config.viewport_expansion,
+				prune_invisible=self.config.prune_invisible_elements,
+				per_frame=self.config.per_frame_extraction,
+				json_transport=self.config.json_dom_transport,
+				highlight_boxes=highlights_on_screenshot and use_vision,
+				remove_highlights=not highlights_on_screenshot,
+				page_info=True,
+			)
+			pages = session.context.pages
+			other_titles = asyncio.gather(*(other.title() for other in pages if other is not page))
+
+			screenshot = None
+			if use_vision and highlights_on_screenshot:
+				# Nothing is drawn into the page, so the screenshot does not have to wait for it
+				content, titles, screenshot = await asyncio.gather(
+					extraction, other_titles, self._capture_screenshot(page, with_highlights=True)
+				)
+			else:
+				content, titles = await asyncio.gather(extraction, other_titles)
+				if use_vision:
+					screenshot = await self._capture_screenshot(page)
 
-			screenshot_b64 = None
-			if use_vision:
-				screenshot_b64 = await self.take_screenshot()
+			if screenshot is not None:
+				screenshot = await self._process_screenshot(screenshot, content.highlight_boxes)
+
+			title = content.page_info.title if content.page_info else await page.title()
+			titles = iter(titles)
+			tabs = [
+				TabInfo(page_id=page_id, url=tab.url, title=title if tab is page else next(titles))
+				for page_id, tab in enumerate(pages)
+			]
 
 			self.current_state = BrowserState(
 				element_tree=content.element_tree,
 				selector_map=content.selector_map,
+				offscreen_above=content.offscreen_above,
+				offscreen_below=content.offscreen_below,
 				url=page.url,
-				title=await page.title(),
-				tabs=await self.get_tabs_info(),
-				screenshot=screenshot_b64,
+				title=title,
+				tabs=tabs,
+				screenshot=screenshot,
+				pixels_above=content.page_info.pixels_above if content.page_info else 0,
+				pixels_below=content.page_info.pixels_below if content.page_info else 0,
 			)
 
 			return self.current_state
@@ -599,34 +691,111 @@ class BrowserContext:
 				return self.current_state
 			raise
 
+	async def has_new_interactive_elements(self) -> bool:
+		"""
+		Cheap check whether new interactive elements appeared since the last state,
+		without waiting for the network or extracting the DOM
+		"""
+		session = await self.get_session()
+		page = await self.get_current_page()
+		if page.url != session.cached_state.url:
+			return True
+
+		try:
+			return await self._get_dom_service(session, page).has_new_interactive_elements()
+		except Exception as e:
+			logger.debug(f'Failed to check for new elements, assuming there are some: {str(e)}')
+			return True
+
+	def _get_dom_service(self, session: BrowserSession, page: Page) -> DomService:
+		"""Reuse one DomService per page so incremental snapshots survive between steps"""
+		for known_page in [p for p in session.dom_services if p.is_closed()]:
+			del session.dom_services[known_page]
+
+		if page not in session.dom_services:
+			session.dom_services[page] = DomService(page)
+		return session.dom_services[page]
+
 	# region - Browser Actions
 
-	async def take_screenshot(self, full_page: bool = False) -> str:
+	async def take_screenshot(
+		self, full_page: bool = False, highlight_boxes: Optional[list[HighlightBox]] = None
+	) -> str:
 		"""
-		Returns a base64 encoded screenshot of the current page.
+		Returns a base64 encoded screenshot of the current page, with `highlight_boxes` drawn onto it.
 		"""
 		page = await self.get_current_page()
+		screenshot = await self._capture_screenshot(
+			page, full_page=full_page, with_highlights=bool(highlight_boxes)
+		)
 
-		screenshot = await page.screenshot(
+		# await self.remove_highlights()
+
+		screenshot = await self._process_screenshot(screenshot, highlight_boxes)
+		return screenshot_to_base64(screenshot)
+
+	async def _capture_screenshot(
+		self, page: Page, full_page: bool = False, with_highlights: bool = False
+	) -> bytes:
+		"""
+		Raw screenshot, already in its final encoding when the browser can produce it. Highlights
+		are drawn afterwards, so `with_highlights` captures it lossless as well.
+		"""
+		if with_highlights or self._screenshot_needs_processing():
+			# Lossless, it is decoded and encoded again
+			return await page.screenshot(full_page=full_page, animations='disabled')
+
+		return await page.screenshot(
 			full_page=full_page,
 			animations='disabled',
+			type=self.config.screenshot_format,  # type: ignore
+			quality=self.config.screenshot_quality
+			if self.config.screenshot_format == 'jpeg'
+			else None,
 		)
 
-		screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
-
-		# await self.remove_highlights()
+	def _screenshot_needs_processing(self) -> bool:
+		return (
+			self.config.screenshot_format == 'webp' or self.config.screenshot_max_size is not None
+		)
 
-		return screenshot_b64
+	async def _process_screenshot(
+		self, screenshot: bytes, highlight_boxes: Optional[list[HighlightBox]] = None
+	) -> bytes:
+		# A lossless capture for highlights that turned out to have no boxes still needs encoding
+		in_final_format = (
+			screenshot_mime_type(screenshot) == f'image/{self.config.screenshot_format}'
+		)
+		if not highlight_boxes and not self._screenshot_needs_processing() and in_final_format:
+			return screenshot
+
+		# Decoding and encoding the image is CPU bound, keep it off the event loop
+		return await asyncio.to_thread(
+			process_screenshot,
+			screenshot,
+			format=self.config.screenshot_format,
+			quality=self.config.screenshot_quality,
+			max_size=self.config.screenshot_max_size,
+			highlight_boxes=highlight_boxes,
+		)
 
 	async def remove_highlights(self):
 		"""
 		Removes all highlight overlays and labels created by the highlightElement function.
 		Handles cases where the page might be closed or inaccessible.
 		"""
+		if self.config.highlights_on_screenshot:
+			# Nothing is drawn into the page
+			return
+
 		try:
 			page = await self.get_current_page()
-			await page.evaluate(
-				"""
+			# Frames extracted separately draw their own highlights
+			frames = page.frames if self.config.per_frame_extraction else [page.main_frame]
+			await asyncio.gather(
+				*(
+					frame.evaluate(
+						"""
                 try {
                     // Remove the highlight container and all its contents
                     const container = document.getElementById('playwright-highlight-container');
@@ -643,6 +812,10 @@ class BrowserContext:
                     console.error('Failed to remove highlights:', e);
                 }
                 """
+					)
+					for frame in frames
+				),
+				return_exceptions=True,
 			)
 		except Exception as e:
 			logger.debug(f'Failed to remove highlights (this is usually ok): {str(e)}')
@@ -941,12 +1114,12 @@ class BrowserContext:
 		"""Get information about all tabs"""
 		session = await self.get_session()
 
-		tabs_info = []
-		for page_id, page in enumerate(session.context.pages):
-			tab_info = TabInfo(page_id=page_id, url=page.url, title=await page.title())
-			tabs_info.append(tab_info)
-
-		return tabs_info
+		pages = session.context.pages
+		titles = await asyncio.gather(*(page.title() for page in pages))
+		return [
+			TabInfo(page_id=page_id, url=page.url, title=title)
+			for page_id, (page, title) in enumerate(zip(pages, titles))
+		]
 
 	async def switch_to_tab(self, page_id: int) -> None:
 		"""Switch to a specific tab by its page_id
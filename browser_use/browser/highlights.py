@@ -0,0 +1,81 @@
+"""
+Set-of-marks overlay drawn onto screenshots: the same boxes and index labels that
+buildDomTree.js draws into the page, without touching the page.
+"""
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from browser_use.dom.views import HighlightBox
+
+# Same palette as flushHighlights in buildDomTree.js
+HIGHLIGHT_COLORS = [
+	ImageColor.getrgb(color)
+	for color in (
+		'#FF0000',
+		'#00FF00',
+		'#0000FF',
+		'#FFA500',
+		'#800080',
+		'#008080',
+		'#FF69B4',
+		'#4B0082',
+		'#FF4500',
+		'#2E8B57',
+		'#DC143C',
+		'#4682B4',
+	)
+]
+
+
+def draw_highlight_boxes(
+	image: Image.Image, boxes: list[HighlightBox], scale: float = 1
+) -> Image.Image:
+	"""
+	Draw highlight boxes and their labels onto a screenshot. Boxes are in screenshot
+	pixels, multiplied by `scale` when the image was resized since.
+	"""
+	image = image.convert('RGBA')
+	overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
+	draw = ImageDraw.Draw(overlay)
+	font = ImageFont.load_default()
+
+	for box in boxes:
+		left, top = box.left * scale, box.top * scale
+		width, height = box.width * scale, box.height * scale
+		right, bottom = left + width, top + height
+		if right < 0 or bottom < 0 or left > image.width or top > image.height:
+			continue
+
+		color = HIGHLIGHT_COLORS[box.highlight_index % len(HIGHLIGHT_COLORS)]
+		draw.rectangle(
+			(left, top, right, bottom), fill=(*color, 26), outline=(*color, 255), width=2
+		)
+
+		label = str(box.highlight_index)
+		text_left, text_top, text_right, text_bottom = draw.textbbox((0, 0), label, font=font)
+		label_width = text_right - text_left + 8
+		label_height = text_bottom - text_top + 4
+
+		# Top-right corner inside the box, above the box if it is too small
+		label_left = right - label_width - 2
+		label_top = top + 2
+		if width < label_width + 4 or height < label_height + 4:
+			label_left = right - label_width
+			label_top = top - label_height - 2
+		# Keep the label within the image
+		label_left = min(max(label_left, 0), image.width - label_width)
+		label_top = max(label_top, 0)
+
+		draw.rounded_rectangle(
+			(label_left, label_top, label_left + label_width, label_top + label_height),
+			radius=4,
+			fill=(*color, 255),
+		)
+		draw.text(
+			(label_left + 4 - text_left, label_top + 2 - text_top),
+			label,
+			fill=(255, 255, 255, 255),
+			font=font,
+		)
+
+	return Image.alpha_composite(image, overlay)
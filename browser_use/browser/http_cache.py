@@ -0,0 +1,298 @@
+"""
+On-disk HTTP cache for static assets, shared by all browser contexts that use the same directory.
+
+Every context starts with an empty browser cache. Scripts, stylesheets, fonts and images are
+served from disk instead, fresh entries without a request and stale ones after a conditional
+request. The least recently used entries are evicted once the directory outgrows its size limit.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from playwright.async_api import APIResponse, Route
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+
+logger = logging.getLogger(__name__)
+
+CACHED_RESOURCE_TYPES = {'script', 'stylesheet', 'font', 'image'}
+
+# Matched by Playwright itself, requests for anything else never reach Python
+STATIC_ASSET_URL_RE = re.compile(
+	r'^https?://[^?#]+\.(js|mjs|css|woff2?|ttf|otf|eot|png|jpe?g|gif|webp|avif|svg|ico)([?#]|$)',
+	re.IGNORECASE,
+)
+
+# Describe the transfer rather than the content, which is stored decoded
+HOP_BY_HOP_HEADERS = {
+	'content-encoding',
+	'content-length',
+	'transfer-encoding',
+	'connection',
+	'keep-alive',
+}
+
+# Belong to the context that made the request, never to the others sharing the cache
+UNSHARED_HEADERS = {'set-cookie', 'set-cookie2'}
+
+# Entries larger than this are not worth the disk space
+MAX_ENTRY_SIZE = 10 * 1024 * 1024
+
+# Other processes write to the directory as well, its listing is trusted for this many seconds
+INDEX_MAX_AGE = 1.0
+
+
+class CachedResponse:
+	def __init__(self, metadata: dict, body: bytes):
+		self.metadata = metadata
+		self.body = body
+
+	@property
+	def headers(self) -> dict[str, str]:
+		return self.metadata['headers']
+
+	def is_fresh(self) -> bool:
+		return time.time() < self.metadata['fresh_until']
+
+	def validators(self) -> dict[str, str]:
+		"""Headers that turn a request into a conditional one"""
+		validators = {}
+		if 'etag' in self.headers:
+			validators['if-none-match'] = self.headers['etag']
+		if 'last-modified' in self.headers:
+			validators['if-modified-since'] = self.headers['last-modified']
+		return validators
+
+
+def parse_cache_control(value: str) -> dict[str, Optional[str]]:
+	directives: dict[str, Optional[str]] = {}
+	for directive in value.lower().split(','):
+		name, _, argument = directive.strip().partition('=')
+		if name:
+			directives[name] = argument.strip('"') or None
+	return directives
+
+
+def fresh_until(headers: dict[str, str], now: float) -> float:
+	"""End of the freshness lifetime of a response, `now` if it has to be revalidated on every use"""
+	cache_control = parse_cache_control(headers.get('cache-control', ''))
+	if 'no-cache' in cache_control:
+		return now
+	# The cache is shared, s-maxage takes precedence (RFC 9111, section 5.2.2.10)
+	max_age = cache_control.get('s-maxage') or cache_control.get('max-age')
+	if max_age is not None and max_age.isdigit():
+		return now + int(max_age) - int(headers.get('age', '0') or 0)
+	if 'expires' in headers:
+		try:
+			return parsedate_to_datetime(headers['expires']).timestamp()
+		except (TypeError, ValueError):
+			return now
+	return now
+
+
+def is_storable(status: int, headers: dict[str, str], body: bytes) -> bool:
+	if status != 200 or len(body) > MAX_ENTRY_SIZE:
+		return False
+	cache_control = parse_cache_control(headers.get('cache-control', ''))
+	if 'no-store' in cache_control or 'private' in cache_control:
+		return False
+	# Responses that differ by anything but the encoding would need the request headers in the key
+	vary = {value.strip().lower() for value in headers.get('vary', '').split(',') if value.strip()}
+	if vary - {'accept-encoding'}:
+		return False
+	# Without a lifetime or validators an entry could never be used
+	return (
+		fresh_until(headers, time.time()) > time.time()
+		or 'etag' in headers
+		or 'last-modified' in headers
+	)
+
+
+class HttpCache:
+	"""
+	Cached responses are stored as `<key>.json` metadata and `<key>.body`, keyed by a hash of the
+	URL. Reads touch the body file, so modification times order the entries from least to most
+	recently used across all processes that share the directory. The size limit applies to the
+	directory as a whole: before evicting, it is listed again if the last listing is older than
+	INDEX_MAX_AGE. `stats` counts hits, revalidated entries, misses and evictions.
+	"""
+
+	def __init__(self, directory: str, max_size: int):
+		self.directory = directory
+		self.max_size = max_size
+		self.stats: Counter[str] = Counter()
+
+		# Key to body size, least recently used first, as of the last listing of the directory and
+		# what this process did since. Entries are read and written in worker threads, the lock
+		# guards the index. The directory is listed on the first write, off the event loop.
+		self._entries: OrderedDict[str, int] = OrderedDict()
+		self._size = 0
+		self._listed_at: Optional[float] = None
+		self._lock = threading.Lock()
+
+	def _list_directory(self) -> None:
+		entries = []
+		with os.scandir(self.directory) as directory:
+			for entry in directory:
+				if not entry.name.endswith('.body'):
+					continue
+				try:
+					stat = entry.stat()
+				except OSError:
+					# Evicted by another process in the meantime
+					continue
+				entries.append((stat.st_mtime_ns, entry.name[: -len('.body')], stat.st_size))
+		self._entries = OrderedDict((key, size) for _, key, size in sorted(entries))
+		self._size = sum(self._entries.values())
+		self._listed_at = time.monotonic()
+
+	def _path(self, key: str, suffix: str) -> str:
+		return os.path.join(self.directory, key + suffix)
+
+	@staticmethod
+	def key(url: str) -> str:
+		return hashlib.sha256(url.encode()).hexdigest()
+
+	def get(self, url: str) -> Optional[CachedResponse]:
+		key = self.key(url)
+		try:
+			with open(self._path(key, '.json'), encoding='utf-8') as f:
+				metadata = json.load(f)
+			with open(self._path(key, '.body'), 'rb') as f:
+				body = f.read()
+		except (OSError, ValueError):
+			# Not cached, or evicted by another process sharing the directory
+			return None
+		if metadata.get('url') != url:
+			return None
+
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+		try:
+			os.utime(self._path(key, '.body'))
+		except OSError:
+			pass
+		return CachedResponse(metadata, body)
+
+	def put(self, url: str, status: int, headers: dict[str, str], body: bytes) -> None:
+		key = self.key(url)
+		headers = {
+			name: value
+			for name, value in headers.items()
+			if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() not in UNSHARED_HEADERS
+		}
+		metadata = {
+			'url': url,
+			'status': status,
+			'headers': headers,
+			'fresh_until': fresh_until(headers, time.time()),
+		}
+
+		# Written to temporary files first, readers never see a partial entry
+		os.makedirs(self.directory, exist_ok=True)
+		for suffix, data in (('.body', body), ('.json', json.dumps(metadata).encode())):
+			temporary_path = self._path(key, f'{suffix}.{os.getpid()}.{threading.get_ident()}.tmp')
+			with open(temporary_path, 'wb') as f:
+				f.write(data)
+			os.replace(temporary_path, self._path(key, suffix))
+
+		with self._lock:
+			if self._listed_at is None or time.monotonic() - self._listed_at > INDEX_MAX_AGE:
+				# Also picks up what other processes wrote and evicted
+				self._list_directory()
+			else:
+				self._size += len(body) - self._entries.pop(key, 0)
+			self._entries[key] = len(body)
+			self._entries.move_to_end(key)
+			self._evict()
+
+	def refresh(self, url: str, cached: CachedResponse, headers: dict[str, str]) -> None:
+		"""Store the new lifetime and validators of a response that was revalidated"""
+		self.put(url, cached.metadata['status'], {**cached.headers, **headers}, cached.body)
+
+	def _evict(self) -> None:
+		while self._size > self.max_size and self._entries:
+			key = next(iter(self._entries))
+			self._forget(key)
+			self.stats['evicted'] += 1
+
+	def _forget(self, key: str) -> None:
+		self._size -= self._entries.pop(key, 0)
+		for suffix in ('.body', '.json'):
+			try:
+				os.remove(self._path(key, suffix))
+			except OSError:
+				pass
+
+	async def attach(self, context: PlaywrightBrowserContext) -> None:
+		await context.route(STATIC_ASSET_URL_RE, self._handle)
+
+	async def _handle(self, route: Route) -> None:
+		request = route.request
+		if request.method != 'GET' or request.resource_type not in CACHED_RESOURCE_TYPES:
+			await route.fallback()
+			return
+		# A shared cache must not store responses to authorized requests (RFC 9111, section 3.5),
+		# nor answer them with responses stored for someone else
+		if await request.header_value('authorization') is not None:
+			await route.fallback()
+			return
+
+		url = request.url
+		# Disk access is kept off the event loop
+		cached = await asyncio.to_thread(self.get, url)
+		if cached is not None and cached.is_fresh():
+			self.stats['hits'] += 1
+			await self._fulfill_from_cache(route, cached)
+			return
+
+		try:
+			headers = {**request.headers, **cached.validators()} if cached else None
+			response = await route.fetch(headers=headers)
+		except Exception as e:
+			logger.debug(f'Failed to fetch {url} for the HTTP cache: {e}')
+			await route.fallback()
+			return
+
+		if cached is not None and response.status == 304:
+			self.stats['revalidated'] += 1
+			await asyncio.to_thread(self.refresh, url, cached, response.headers)
+			await self._fulfill_from_cache(route, cached)
+			return
+
+		self.stats['misses'] += 1
+		await self._store(url, response)
+		await route.fulfill(response=response)
+
+	async def _store(self, url: str, response: APIResponse) -> None:
+		try:
+			body = await response.body()
+		except Exception:
+			return
+		if is_storable(response.status, response.headers, body):
+			await asyncio.to_thread(self.put, url, response.status, response.headers, body)
+
+	async def _fulfill_from_cache(self, route: Route, cached: CachedResponse) -> None:
+		await route.fulfill(
+			status=cached.metadata['status'], headers=cached.headers, body=cached.body
+		)
+
+
+_caches: dict[str, HttpCache] = {}
+
+
+def get_http_cache(directory: str, max_size: int) -> HttpCache:
+	"""One cache per directory, so that all contexts of the process share its index and counters"""
+	directory = os.path.abspath(directory)
+	if directory not in _caches:
+		_caches[directory] = HttpCache(directory, max_size)
+	return _caches[directory]
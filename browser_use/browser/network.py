@@ -0,0 +1,331 @@
+"""
+Network handling of browser contexts: activity tracking for page load waits and request blocking.
+
+One tracker listens to the requests of a whole browser context for its lifetime, so waiting
+for the network to settle costs no listener setup and no polling.
+"""
+
+import asyncio
+import base64
+import re
+from collections import Counter
+from typing import Optional
+
+from playwright.async_api import BrowserContext as PlaywrightBrowserContext
+from playwright.async_api import Page, Request, Response, Route
+
+RELEVANT_RESOURCE_TYPES = {
+	'document',
+	'stylesheet',
+	'image',
+	'font',
+	'script',
+	'iframe',
+}
+
+RELEVANT_CONTENT_TYPES = (
+	'text/html',
+	'text/css',
+	'application/javascript',
+	'image/',
+	'font/',
+	'application/json',
+)
+
+# Streaming or real-time responses never finish loading in a useful sense
+STREAMING_CONTENT_TYPES = (
+	'streaming',
+	'video',
+	'audio',
+	'webm',
+	'mp4',
+	'event-stream',
+	'websocket',
+	'protobuf',
+)
+
+# Requests that do not matter for the page being usable
+IGNORED_URL_PATTERNS = (
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+)
+
+
+def compile_patterns(patterns: tuple[str, ...]) -> re.Pattern:
+	"""One regex alternation instead of a substring search per pattern"""
+	return re.compile('|'.join(re.escape(pattern) for pattern in patterns))
+
+
+IGNORED_URL_RE = compile_patterns(IGNORED_URL_PATTERNS)
+RELEVANT_CONTENT_TYPE_RE = compile_patterns(RELEVANT_CONTENT_TYPES)
+STREAMING_CONTENT_TYPE_RE = compile_patterns(STREAMING_CONTENT_TYPES)
+
+# Responses larger than this are likely not essential for the page load
+MAX_RELEVANT_CONTENT_LENGTH = 5 * 1024 * 1024
+
+
+def is_relevant_request(request: Request) -> bool:
+	if request.resource_type not in RELEVANT_RESOURCE_TYPES:
+		return False
+
+	url = request.url.lower()
+	if url.startswith(('data:', 'blob:')) or IGNORED_URL_RE.search(url):
+		return False
+
+	headers = request.headers
+	if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in ('video', 'audio'):
+		return False
+	return True
+
+
+class NetworkTracker:
+	"""
+	Relevant requests in flight per page. Every change sets the page's current activity event,
+	which wakes up whoever waits for the page to become idle.
+	"""
+
+	def __init__(self):
+		self._pending: dict[Page, set[Request]] = {}
+		self._last_activity: dict[Page, float] = {}
+		self._activity: dict[Page, asyncio.Event] = {}
+
+	def attach(self, context: PlaywrightBrowserContext) -> None:
+		"""Listen to all pages of the context, including the ones opened later"""
+		# Plain callbacks: Playwright runs coroutine listeners as separate tasks
+		context.on('request', self._on_request)
+		context.on('response', self._on_response)
+		context.on('requestfailed', self._on_request_done)
+		context.on('page', lambda page: page.on('close', self._forget_page))
+		for page in context.pages:
+			page.on('close', self._forget_page)
+
+	def pending_requests(self, page: Page) -> set[Request]:
+		return self._pending.get(page, set())
+
+	def _on_request(self, request: Request) -> None:
+		if not is_relevant_request(request):
+			return
+		page = self._page_of(request)
+		if page is None:
+			return
+		self._pending.setdefault(page, set()).add(request)
+		self._record_activity(page)
+
+	def _on_response(self, response: Response) -> None:
+		request = response.request
+		page = self._page_of(request)
+		if page is None or request not in self.pending_requests(page):
+			return
+
+		headers = response.headers
+		content_type = headers.get('content-type', '').lower()
+		content_length = headers.get('content-length')
+		relevant = (
+			not STREAMING_CONTENT_TYPE_RE.search(content_type)
+			and RELEVANT_CONTENT_TYPE_RE.search(content_type) is not None
+			and not (
+				content_length
+				and content_length.isdigit()
+				and int(content_length) > MAX_RELEVANT_CONTENT_LENGTH
+			)
+		)
+		self._pending[page].discard(request)
+		if relevant:
+			self._record_activity(page)
+		else:
+			# Irrelevant responses do not reset the idle time, but may end the wait
+			self._wake(page)
+
+	def _on_request_done(self, request: Request) -> None:
+		page = self._page_of(request)
+		if page is not None and request in self.pending_requests(page):
+			self._pending[page].discard(request)
+			self._record_activity(page)
+
+	def _page_of(self, request: Request) -> Optional[Page]:
+		try:
+			return request.frame.page
+		except Exception:
+			# Service worker requests have no frame
+			return None
+
+	def _record_activity(self, page: Page) -> None:
+		self._last_activity[page] = asyncio.get_running_loop().time()
+		self._wake(page)
+
+	def _wake(self, page: Page) -> None:
+		event = self._activity.pop(page, None)
+		if event is not None:
+			event.set()
+
+	def _forget_page(self, page: Page) -> None:
+		self._pending.pop(page, None)
+		self._last_activity.pop(page, None)
+		self._wake(page)
+
+	async def wait_for_idle(self, page: Page, idle_time: float, timeout: float) -> bool:
+		"""
+		Wait until no relevant request of `page` has been in flight for `idle_time` seconds,
+		counted from the start of the wait at the earliest. Returns False on timeout.
+		"""
+		loop = asyncio.get_running_loop()
+		start_time = loop.time()
+		deadline = start_time + timeout
+		while True:
+			now = loop.time()
+			if self.pending_requests(page):
+				wake_up = deadline
+			else:
+				idle_since = max(self._last_activity.get(page, start_time), start_time)
+				if now - idle_since >= idle_time:
+					return True
+				wake_up = min(idle_since + idle_time, deadline)
+			if now >= deadline:
+				return False
+
+			event = self._activity.setdefault(page, asyncio.Event())
+			try:
+				await asyncio.wait_for(event.wait(), wake_up - now)
+			except asyncio.TimeoutError:
+				pass
+
+
+# Hosts of trackers and ads that pages work without. Unlike IGNORED_URL_PATTERNS, these are
+# blocked outright, so they only match third-party hosts and never functional widgets or CDNs.
+BLOCKED_URL_PATTERNS = (
+	# Analytics and tracking
+	'google-analytics.com',
+	'googletagmanager.com',
+	'analytics.google.com',
+	'stats.g.doubleclick.net',
+	'connect.facebook.net',
+	'static.hotjar.com',
+	'script.hotjar.com',
+	'cdn.segment.com',
+	'api.segment.io',
+	'cdn.mxpnl.com',
+	'api-js.mixpanel.com',
+	'cdn.amplitude.com',
+	'api.amplitude.com',
+	'fullstory.com/s/fs.js',
+	'clarity.ms',
+	'bat.bing.com',
+	'scorecardresearch.com',
+	'quantserve.com',
+	'js-agent.newrelic.com',
+	'bam.nr-data.net',
+	'static.ads-twitter.com',
+	'analytics.tiktok.com',
+	'snap.licdn.com',
+	# Ads
+	'doubleclick.net',
+	'googlesyndication.com',
+	'googleadservices.com',
+	'adservice.google.com',
+	'amazon-adsystem.com',
+	'adnxs.com',
+	'criteo.com',
+	'criteo.net',
+	'taboola.com',
+	'outbrain.com',
+	'pubmatic.com',
+	'rubiconproject.com',
+	'casalemedia.com',
+	'moatads.com',
+)
+
+# Matched by Playwright itself, only matching requests are sent to Python
+BLOCKED_URL_RE = re.compile(
+	r'^[a-z]+://([^/?#]*\.)?('
+	+ '|'.join(re.escape(pattern) for pattern in BLOCKED_URL_PATTERNS)
+	+ ')([/?#:]|$)'
+)
+
+# Stand-in for images: a transparent 1x1 GIF keeps <img> elements and the boxes that attributes
+# or CSS give them. Images laid out at their own dimensions collapse to 1x1.
+TRANSPARENT_GIF = base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
+
+
+class RequestBlocker:
+	"""
+	Aborts tracker, ad and media requests of a browser context and optionally replaces images and
+	fonts with empty stand-ins. `blocked` counts the requests per category.
+	"""
+
+	def __init__(
+		self,
+		block_trackers: bool = False,
+		block_media: bool = False,
+		stub_images: bool = False,
+		stub_fonts: bool = False,
+	):
+		self.block_trackers = block_trackers
+		self.block_media = block_media
+		self.stub_images = stub_images
+		self.stub_fonts = stub_fonts
+		self.blocked: Counter[str] = Counter()
+
+	@property
+	def enabled(self) -> bool:
+		return self.block_trackers or self.block_media or self.stub_images or self.stub_fonts
+
+	async def attach(self, context: PlaywrightBrowserContext) -> None:
+		if self.block_media or self.stub_images or self.stub_fonts:
+			# The resource type is only known per request, so every request comes through here
+			await context.route('**/*', self._handle_resource)
+		if self.block_trackers:
+			# Registered last to be matched first
+			await context.route(BLOCKED_URL_RE, self._handle_tracker)
+
+	async def _handle_tracker(self, route: Route) -> None:
+		self.blocked['tracker'] += 1
+		await route.abort('blockedbyclient')
+
+	async def _handle_resource(self, route: Route) -> None:
+		resource_type = route.request.resource_type
+		if resource_type == 'media' and self.block_media:
+			self.blocked['media'] += 1
+			await route.abort('blockedbyclient')
+		elif resource_type == 'image' and self.stub_images:
+			self.blocked['image'] += 1
+			await route.fulfill(status=200, content_type='image/gif', body=TRANSPARENT_GIF)
+		elif resource_type == 'font' and self.stub_fonts:
+			# Text falls back to the next font of the font stack
+			self.blocked['font'] += 1
+			await route.fulfill(status=200, content_type='font/woff2', body=b'')
+		else:
+			await route.fallback()
@@ -0,0 +1,85 @@
+"""
+Screenshot encoding: highlight drawing, downscaling and compression in one decode/encode pass.
+Screenshots are kept as raw bytes and only base64 encoded for LLM messages and JSON.
+"""
+
+import base64
+import io
+from typing import Literal, Optional
+
+from PIL import Image
+
+from browser_use.browser.highlights import draw_highlight_boxes
+from browser_use.dom.views import HighlightBox
+
+ScreenshotFormat = Literal['png', 'jpeg', 'webp']
+
+
+def process_screenshot(
+	screenshot: bytes,
+	format: ScreenshotFormat = 'png',
+	quality: Optional[int] = None,
+	max_size: Optional[int] = None,
+	highlight_boxes: Optional[list[HighlightBox]] = None,
+) -> bytes:
+	"""
+	Downscale a screenshot so that its longest side is at most `max_size`, draw `highlight_boxes`
+	onto it and encode it as `format`. `quality` applies to jpeg and webp.
+	"""
+	image = Image.open(io.BytesIO(screenshot))
+
+	scale = 1.0
+	if max_size and max(image.size) > max_size:
+		scale = max_size / max(image.size)
+		size = (max(round(image.width * scale), 1), max(round(image.height * scale), 1))
+		image = image.resize(size, Image.Resampling.LANCZOS)
+
+	if highlight_boxes:
+		image = draw_highlight_boxes(image, highlight_boxes, scale)
+
+	options = {}
+	if format != 'png':
+		# Neither format is worth keeping an alpha channel for
+		image = image.convert('RGB')
+		if quality is not None:
+			options['quality'] = quality
+
+	output = io.BytesIO()
+	image.save(output, format=format.upper(), **options)
+	return output.getvalue()
+
+
+def perceptual_hash(screenshot: bytes, hash_size: int = 96) -> bytes:
+	"""
+	Mean brightness of each cell of a `hash_size` x `hash_size` grid laid over the image. Unlike a
+	hash of one bit per cell, it keeps how much each cell changed, so that a small change in one
+	cell (a ticked checkbox, a line of error text) stands out from compression noise.
+	"""
+	image = Image.open(io.BytesIO(screenshot))
+	# Lets the JPEG decoder skip most of the work
+	image.draft('L', (hash_size * 4, hash_size * 4))
+	return image.convert('L').resize((hash_size, hash_size), Image.Resampling.BILINEAR).tobytes()
+
+
+def hash_distance(first: bytes, second: bytes, tolerance: int = 8) -> int:
+	"""Number of cells whose brightness differs by more than `tolerance` out of 255"""
+	if len(first) != len(second):
+		return max(len(first), len(second))
+	return sum(abs(a - b) > tolerance for a, b in zip(first, second))
+
+
+def screenshot_mime_type(screenshot: bytes) -> str:
+	"""Mime type of a screenshot, from its magic bytes"""
+	if screenshot.startswith(b'\xff\xd8'):
+		return 'image/jpeg'
+	if screenshot[:4] == b'RIFF' and screenshot[8:12] == b'WEBP':
+		return 'image/webp'
+	return 'image/png'
+
+
+def screenshot_to_base64(screenshot: bytes) -> str:
+	return base64.b64encode(screenshot).decode('utf-8')
+
+
+def screenshot_to_data_url(screenshot: bytes) -> str:
+	return f'data:{screenshot_mime_type(screenshot)};base64,{screenshot_to_base64(screenshot)}'
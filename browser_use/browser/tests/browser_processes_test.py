@@ -0,0 +1,87 @@
+import pytest
+
+import browser_use.browser.browser as browser_module
+from browser_use.browser.browser import Browser, BrowserConfig
+
+
+class FakePlaywrightBrowser:
+	def __init__(self):
+		self.contexts = []
+		self.connected = True
+		self.listeners = {}
+
+	def on(self, event, listener):
+		self.listeners[event] = listener
+
+	def is_connected(self):
+		return self.connected
+
+	def crash(self):
+		self.connected = False
+		self.listeners['disconnected'](self)
+
+	async def close(self):
+		self.connected = False
+
+
+class FakePlaywright:
+	async def stop(self):
+		pass
+
+
+class FakeAsyncPlaywright:
+	async def start(self):
+		return FakePlaywright()
+
+
+@pytest.fixture
+def launched(monkeypatch):
+	launched = []
+
+	async def setup_browser(self, playwright):
+		browser = FakePlaywrightBrowser()
+		launched.append(browser)
+		return browser
+
+	monkeypatch.setattr(browser_module, 'async_playwright', FakeAsyncPlaywright)
+	monkeypatch.setattr(Browser, '_setup_browser', setup_browser)
+	return launched
+
+
+async def test_contexts_go_to_the_least_loaded_process(launched):
+	browser = Browser(config=BrowserConfig(browser_processes=3, use_physical_input=False))
+
+	# A burst of contexts before any of them exists is spread over all processes
+	picked = [await browser.get_playwright_browser() for _ in range(3)]
+	assert len(launched) == 3
+	assert set(map(id, picked)) == set(map(id, launched))
+
+	launched[0].contexts = ['a', 'b']
+	launched[1].contexts = ['c']
+	launched[2].contexts = ['d', 'e']
+	assert await browser.get_playwright_browser() is launched[1]
+
+	await browser.close()
+	assert browser.playwright_browsers == [] and not any(b.connected for b in launched)
+
+
+async def test_crashed_process_is_replaced(launched):
+	browser = Browser(config=BrowserConfig(browser_processes=2, use_physical_input=False))
+	await browser.get_playwright_browser()
+	crashed = launched[0]
+	crashed.crash()
+	assert crashed not in browser.playwright_browsers
+
+	for _ in range(4):
+		assert await browser.get_playwright_browser() is not crashed
+	assert len(launched) == 3 and len(browser.playwright_browsers) == 2
+
+
+async def test_connected_browser_is_a_single_process(launched):
+	browser = Browser(
+		config=BrowserConfig(
+			wss_url='ws://localhost:3000', browser_processes=4, use_physical_input=False
+		)
+	)
+	await browser.get_playwright_browser()
+	assert len(launched) == 1
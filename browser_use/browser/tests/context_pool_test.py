@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+
+@pytest.fixture
+def fake_sessions(monkeypatch):
+	"""Contexts get a session without a browser, closing and resetting is recorded"""
+	events = []
+
+	async def get_session(self):
+		await asyncio.sleep(0)
+		self.session = object()
+		events.append(('ready', self))
+		return self.session
+
+	async def close(self):
+		self.session = None
+		events.append(('closed', self))
+
+	async def reset(self):
+		events.append(('reset', self))
+
+	monkeypatch.setattr(BrowserContext, 'get_session', get_session)
+	monkeypatch.setattr(BrowserContext, 'close', close)
+	monkeypatch.setattr(BrowserContext, 'reset', reset)
+	return events
+
+
+async def test_leased_contexts_come_ready_and_are_replaced(fake_sessions):
+	browser = Browser(config=BrowserConfig(context_pool_size=2, use_physical_input=False))
+	await browser.warm_up()
+	pooled = list(browser._context_pool)
+	assert len(pooled) == 2
+
+	context = await browser.lease_context()
+	assert context in pooled and context.session is not None
+	await browser.warm_up()
+	assert len(browser._context_pool) == 2
+
+	# Discarded by default, reused on request while the pool has room
+	await browser.release_context(context)
+	assert ('closed', context) in fake_sessions
+	second = await browser.lease_context()
+	await browser.release_context(second, reuse=True)
+	assert ('reset', second) in fake_sessions
+	assert second in browser._context_pool
+
+	await browser.close()
+	assert browser._context_pool == []
+
+
+async def test_other_configs_get_their_own_context(fake_sessions):
+	browser = Browser(config=BrowserConfig(context_pool_size=1, use_physical_input=False))
+	await browser.warm_up()
+
+	context = await browser.lease_context(BrowserContextConfig(flat_dom_format=True))
+
+	assert context.session is None
+	assert context.config.flat_dom_format
+	assert len(browser._context_pool) == 1
+	await browser.close()
+
+
+async def test_agent_runs_in_a_leased_context(fake_sessions, monkeypatch):
+	from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+	from browser_use.agent.service import Agent
+
+	monkeypatch.setenv('ANONYMIZED_TELEMETRY', 'false')
+	used_contexts = []
+
+	async def step(self, step_info=None):
+		used_contexts.append(self.browser_context)
+
+	monkeypatch.setattr(Agent, 'step', step)
+	browser = Browser(config=BrowserConfig(context_pool_size=1, use_physical_input=False))
+	await browser.warm_up()
+	pooled = browser._context_pool[0]
+
+	agent = Agent(
+		task='task', llm=FakeListChatModel(responses=[]), browser=browser, generate_gif=False
+	)
+	await agent.run(max_steps=1)
+
+	assert used_contexts == [pooled]
+	# Handed back through the browser, which keeps the pool filled
+	assert ('closed', pooled) in fake_sessions
+	assert not agent.leased_browser_context
+	await browser.close()
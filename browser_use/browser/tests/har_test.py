@@ -0,0 +1,83 @@
+import types
+
+import browser_use.controller.service as controller_module
+from browser_use.agent.views import ActionResult
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.controller.service import Controller
+
+
+class FakePlaywrightContext:
+	def __init__(self):
+		self.pages = []
+		self.har_routes = []
+
+	def on(self, event: str, callback):
+		pass
+
+	async def add_init_script(self, script: str):
+		pass
+
+	async def route_from_har(self, har: str, not_found: str):
+		self.har_routes.append((har, not_found))
+
+
+class FakePlaywrightBrowser:
+	def __init__(self):
+		self.contexts = []
+		self.context_options = None
+
+	async def new_context(self, **options):
+		self.context_options = options
+		return FakePlaywrightContext()
+
+
+def browser_context(config: BrowserContextConfig) -> BrowserContext:
+	browser = types.SimpleNamespace(
+		config=types.SimpleNamespace(chrome_instance_path=None, use_physical_input=False)
+	)
+	return BrowserContext(browser=browser, config=config)  # type: ignore
+
+
+async def test_traffic_is_recorded_per_context(tmp_path):
+	context = browser_context(BrowserContextConfig(har_path=str(tmp_path)))
+	playwright_browser = FakePlaywrightBrowser()
+
+	await context._create_context(playwright_browser)  # type: ignore
+
+	assert context.har_file == str(tmp_path / f'{context.context_id}.har')
+	assert playwright_browser.context_options['record_har_path'] == context.har_file  # type: ignore
+
+
+async def test_replay_serves_requests_from_har(tmp_path):
+	har_file = str(tmp_path / 'run.har')
+	context = browser_context(BrowserContextConfig(replay_har_path=har_file))
+
+	playwright_context = await context._create_context(FakePlaywrightBrowser())  # type: ignore
+
+	assert playwright_context.har_routes == [(har_file, 'abort')]
+
+
+async def test_replayed_actions_do_not_wait_for_each_other(monkeypatch):
+	sleeps = []
+
+	async def sleep(seconds):
+		sleeps.append(seconds)
+
+	async def act(action, browser_context):
+		return ActionResult()
+
+	async def remove_highlights():
+		pass
+
+	controller = Controller()
+	monkeypatch.setattr(controller, 'act', act)
+	monkeypatch.setattr(controller_module, 'asyncio', types.SimpleNamespace(sleep=sleep))
+	actions = [types.SimpleNamespace(get_index=lambda: None) for _ in range(3)]
+
+	for config in (BrowserContextConfig(), BrowserContextConfig(replay_har_path='run.har')):
+		context = types.SimpleNamespace(config=config, remove_highlights=remove_highlights)
+		results = await controller.multi_act(actions, context)  # type: ignore
+		assert len(results) == 3
+
+	# Only the live context waited between its actions
+	assert sleeps == [1, 1]
@@ -0,0 +1,139 @@
+import io
+
+from PIL import Image, ImageDraw
+
+from browser_use.browser.highlights import HIGHLIGHT_COLORS, draw_highlight_boxes
+from browser_use.browser.screenshots import (
+	hash_distance,
+	perceptual_hash,
+	process_screenshot,
+	screenshot_mime_type,
+)
+from browser_use.dom.views import HighlightBox
+
+
+def blank_screenshot(width: int = 200, height: int = 100) -> bytes:
+	output = io.BytesIO()
+	Image.new('RGB', (width, height), 'white').save(output, format='PNG')
+	return output.getvalue()
+
+
+def test_boxes_are_drawn_onto_the_screenshot():
+	boxes = [
+		HighlightBox(highlight_index=0, left=10, top=10, width=80, height=40),
+		# Too small for its label, which goes above the box
+		HighlightBox(highlight_index=1, left=150, top=60, width=6, height=6),
+		# Out of the screenshot entirely
+		HighlightBox(highlight_index=2, left=500, top=500, width=10, height=10),
+	]
+
+	image = draw_highlight_boxes(Image.new('RGB', (200, 100), 'white'), boxes).convert('RGB')
+
+	assert image.size == (200, 100)
+	assert image.getpixel((10, 30)) == HIGHLIGHT_COLORS[0]
+	assert image.getpixel((150, 63)) == HIGHLIGHT_COLORS[1]
+	# Box fills are translucent, the page stays readable
+	assert image.getpixel((30, 40)) not in (HIGHLIGHT_COLORS[0], (255, 255, 255))
+	assert image.getpixel((5, 95)) == (255, 255, 255)
+
+
+def test_screenshot_is_downscaled_and_reencoded():
+	boxes = [HighlightBox(highlight_index=0, left=100, top=100, width=200, height=100)]
+
+	screenshot = process_screenshot(
+		blank_screenshot(800, 400), format='jpeg', quality=50, max_size=400, highlight_boxes=boxes
+	)
+
+	assert screenshot_mime_type(screenshot) == 'image/jpeg'
+	image = Image.open(io.BytesIO(screenshot))
+	assert image.size == (400, 200)
+	# Boxes follow the downscaled image
+	red, green, blue = image.getpixel((50, 75))  # type: ignore
+	assert red > 200 and green < 80 and blue < 80
+	assert (
+		screenshot_mime_type(process_screenshot(blank_screenshot(), format='webp')) == 'image/webp'
+	)
+
+
+def test_perceptual_hash_ignores_compression_but_not_content():
+	page = Image.new('RGB', (400, 300), 'white')
+	for top in range(20, 300, 40):
+		page.paste((30, 30, 30), (20, top, 300, top + 12))
+	output = io.BytesIO()
+	page.save(output, format='PNG')
+	screenshot = output.getvalue()
+
+	recompressed = process_screenshot(screenshot, format='jpeg', quality=40)
+	scrolled_page = Image.new('RGB', (400, 300), 'white')
+	scrolled_page.paste(page.crop((0, 100, 400, 300)), (0, 0))
+	output = io.BytesIO()
+	scrolled_page.save(output, format='PNG')
+
+	assert hash_distance(perceptual_hash(screenshot), perceptual_hash(recompressed)) == 0
+	assert hash_distance(perceptual_hash(screenshot), perceptual_hash(output.getvalue())) > 0
+
+
+def form_screenshot(checked: bool = False, error: bool = False, format: str = 'PNG') -> bytes:
+	page = Image.new('RGB', (1280, 1100), 'white')
+	draw = ImageDraw.Draw(page)
+	draw.rectangle((0, 0, 1280, 60), fill=(30, 60, 120))
+	for line in range(20):
+		draw.text((40, 100 + line * 22), f'Item {line} lorem ipsum dolor sit amet', fill='black')
+	draw.rectangle((40, 600, 53, 613), outline='gray')
+	if checked:
+		draw.line((42, 607, 46, 611), fill='black', width=2)
+		draw.line((46, 611, 52, 602), fill='black', width=2)
+	draw.rectangle((40, 640, 340, 670), outline='gray')
+	if error:
+		draw.text((40, 676), 'Please enter a valid email', fill=(200, 0, 0))
+	output = io.BytesIO()
+	page.save(output, format=format, quality=80)
+	return output.getvalue()
+
+
+def test_perceptual_hash_sees_small_changes_on_a_full_page():
+	screenshot = perceptual_hash(form_screenshot())
+
+	assert hash_distance(screenshot, perceptual_hash(form_screenshot(format='JPEG'))) == 0
+	# A ticked checkbox and an inline error are a few pixels of a 1280x1100 page
+	assert hash_distance(screenshot, perceptual_hash(form_screenshot(checked=True))) > 0
+	assert hash_distance(screenshot, perceptual_hash(form_screenshot(error=True))) > 0
+	assert (
+		hash_distance(
+			perceptual_hash(form_screenshot(format='JPEG')),
+			perceptual_hash(form_screenshot(checked=True, format='JPEG')),
+		)
+		> 0
+	)
+
+
+class ScreenshotPage:
+	def __init__(self):
+		self.options: dict = {}
+
+	async def screenshot(self, **options) -> bytes:
+		self.options = options
+		return blank_screenshot()
+
+
+async def test_screenshots_with_highlights_are_compressed_once():
+	from browser_use.browser.browser import Browser, BrowserConfig
+	from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+	config = BrowserContextConfig(screenshot_format='jpeg', highlights_on_screenshot=True)
+	browser = Browser(config=BrowserConfig(use_physical_input=False))
+	context = BrowserContext(browser=browser, config=config)
+	page = ScreenshotPage()
+
+	# Captured lossless, the boxes are drawn before the only JPEG encoding
+	screenshot = await context._capture_screenshot(page, with_highlights=True)  # type: ignore
+	assert 'type' not in page.options
+	boxes = [HighlightBox(highlight_index=0, left=10, top=10, width=50, height=20)]
+	assert (
+		screenshot_mime_type(await context._process_screenshot(screenshot, boxes)) == 'image/jpeg'
+	)
+	# Also when the page had nothing to highlight
+	assert screenshot_mime_type(await context._process_screenshot(screenshot, [])) == 'image/jpeg'
+
+	await context._capture_screenshot(page)  # type: ignore
+	assert page.options['type'] == 'jpeg'
@@ -0,0 +1,136 @@
+import time
+
+from browser_use.browser.http_cache import HttpCache, fresh_until, is_storable
+
+IMMUTABLE = {
+	'cache-control': 'public, max-age=31536000, immutable',
+	'content-type': 'application/javascript',
+}
+
+
+class FakeRequest:
+	def __init__(self, url: str):
+		self.url = url
+		self.method = 'GET'
+		self.resource_type = 'script'
+		self.headers = {}
+
+	async def header_value(self, name: str):
+		return self.headers.get(name)
+
+
+class FakeResponse:
+	def __init__(self, status: int, headers: dict, body: bytes):
+		self.status = status
+		self.headers = headers
+		self._body = body
+
+	async def body(self) -> bytes:
+		return self._body
+
+
+class FakeRoute:
+	def __init__(self, url: str, response: FakeResponse):
+		self.request = FakeRequest(url)
+		self.response = response
+		self.fetched_headers = None
+		self.fulfilled = None
+		self.fell_back = False
+
+	async def fetch(self, headers=None):
+		self.fetched_headers = headers
+		return self.response
+
+	async def fulfill(self, status=None, headers=None, body=None, response=None):
+		self.fulfilled = response._body if response else body
+
+	async def fallback(self):
+		self.fell_back = True
+
+
+async def test_assets_are_served_from_disk(tmp_path):
+	cache = HttpCache(str(tmp_path), max_size=1024)
+	url = 'https://example.com/app.js'
+
+	first = FakeRoute(
+		url, FakeResponse(200, {**IMMUTABLE, 'content-encoding': 'gzip'}, b'console.log(1)')
+	)
+	await cache._handle(first)  # type: ignore
+	# Another context of the same run, nothing is fetched
+	second = FakeRoute(url, FakeResponse(500, {}, b''))
+	await cache._handle(second)  # type: ignore
+
+	assert first.fulfilled == second.fulfilled == b'console.log(1)'
+	assert second.fetched_headers is None
+	assert cache.stats == {'misses': 1, 'hits': 1}
+	cached = cache.get(url)
+	assert cached is not None and 'content-encoding' not in cached.headers
+
+
+async def test_stale_assets_are_revalidated(tmp_path):
+	cache = HttpCache(str(tmp_path), max_size=1024)
+	url = 'https://example.com/style.css'
+	cache.put(url, 200, {'cache-control': 'no-cache', 'etag': '"v1"'}, b'body {}')
+
+	route = FakeRoute(url, FakeResponse(304, {'etag': '"v1"'}, b''))
+	await cache._handle(route)  # type: ignore
+
+	assert route.fetched_headers == {'if-none-match': '"v1"'}
+	assert route.fulfilled == b'body {}'
+	assert cache.stats == {'revalidated': 1}
+
+
+async def test_cookies_and_authorized_responses_are_not_shared(tmp_path):
+	cache = HttpCache(str(tmp_path), max_size=1024)
+	url = 'https://example.com/app.js'
+
+	route = FakeRoute(url, FakeResponse(200, {**IMMUTABLE, 'set-cookie': 'session=1'}, b'ok'))
+	await cache._handle(route)  # type: ignore
+	cached = cache.get(url)
+	assert cached is not None and 'set-cookie' not in cached.headers
+
+	private_url = 'https://example.com/private.js'
+	authorized = FakeRoute(private_url, FakeResponse(200, IMMUTABLE, b'secret'))
+	authorized.request.headers = {'authorization': 'Bearer token'}
+	await cache._handle(authorized)  # type: ignore
+	assert authorized.fell_back and cache.get(private_url) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+	cache = HttpCache(str(tmp_path), max_size=10)
+	cache.put('https://example.com/a.js', 200, IMMUTABLE, b'aaaa')
+	cache.put('https://example.com/b.js', 200, IMMUTABLE, b'bbbb')
+	assert cache.get('https://example.com/a.js') is not None
+	cache.put('https://example.com/c.js', 200, IMMUTABLE, b'cccc')
+
+	assert cache.get('https://example.com/b.js') is None
+	assert cache.stats['evicted'] == 1
+
+
+def test_size_limit_covers_entries_of_other_processes(tmp_path):
+	cache = HttpCache(str(tmp_path), max_size=10)
+	cache.put('https://example.com/a.js', 200, IMMUTABLE, b'aaaa')
+	cache.put('https://example.com/b.js', 200, IMMUTABLE, b'bbbb')
+
+	# Another process reads the entries the first one wrote, and counts them against the limit
+	other_process = HttpCache(str(tmp_path), max_size=10)
+	assert other_process.get('https://example.com/a.js') is not None
+	other_process.put('https://example.com/c.js', 200, IMMUTABLE, b'cccc')
+
+	assert other_process.stats['evicted'] == 1
+	assert cache.get('https://example.com/b.js') is None
+	assert sum(path.stat().st_size for path in tmp_path.glob('*.body')) <= 10
+
+
+def test_storable_responses():
+	assert is_storable(200, IMMUTABLE, b'x')
+	assert not is_storable(200, {**IMMUTABLE, 'cache-control': 'no-store'}, b'x')
+	assert not is_storable(200, {**IMMUTABLE, 'vary': 'Cookie'}, b'x')
+	assert not is_storable(200, {'content-type': 'text/css'}, b'x')
+	assert is_storable(200, {'etag': '"1"'}, b'x')
+
+
+def test_shared_lifetime_takes_precedence():
+	now = time.time()
+	assert fresh_until({'cache-control': 'max-age=600, s-maxage=0'}, now) == now
+	assert fresh_until({'cache-control': 'max-age=0, s-maxage=600'}, now) == now + 600
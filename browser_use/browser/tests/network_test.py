@@ -0,0 +1,121 @@
+import asyncio
+
+from browser_use.browser.network import (
+	BLOCKED_URL_RE,
+	IGNORED_URL_RE,
+	TRANSPARENT_GIF,
+	NetworkTracker,
+	RequestBlocker,
+)
+
+
+class FakeContext:
+	def __init__(self):
+		self.pages = []
+		self.listeners = {}
+		self.routes = []
+
+	def on(self, event: str, callback):
+		self.listeners[event] = callback
+
+	async def route(self, url, handler):
+		self.routes.append((url, handler))
+
+
+class FakeFrame:
+	def __init__(self, page):
+		self.page = page
+
+
+class FakeRequest:
+	def __init__(self, page, url: str, resource_type: str = 'script'):
+		self.frame = FakeFrame(page)
+		self.url = url
+		self.resource_type = resource_type
+		self.headers = {}
+
+
+class FakeResponse:
+	def __init__(self, request: FakeRequest, content_type: str = 'application/javascript'):
+		self.request = request
+		self.headers = {'content-type': content_type}
+
+
+class FakeRoute:
+	def __init__(self, request: FakeRequest):
+		self.request = request
+		self.outcome = None
+
+	async def abort(self, error_code: str):
+		self.outcome = 'abort'
+
+	async def fulfill(self, status: int, content_type: str, body: bytes):
+		self.outcome = body
+
+	async def fallback(self):
+		self.outcome = 'fallback'
+
+
+async def test_waits_until_requests_are_done_and_quiet():
+	context = FakeContext()
+	tracker = NetworkTracker()
+	tracker.attach(context)  # type: ignore
+	page = object()
+
+	script = FakeRequest(page, 'https://example.com/app.js')
+	context.listeners['request'](script)
+	context.listeners['request'](FakeRequest(page, 'https://www.google-analytics.com/collect'))
+	assert len(tracker.pending_requests(page)) == 1  # type: ignore
+
+	async def finish():
+		await asyncio.sleep(0.05)
+		context.listeners['response'](FakeResponse(script))
+
+	loop = asyncio.get_running_loop()
+	start = loop.time()
+	finishing = asyncio.create_task(finish())
+	assert await tracker.wait_for_idle(page, idle_time=0.1, timeout=1)  # type: ignore
+	await finishing
+
+	# Idle time counts from the response that completed the page
+	assert loop.time() - start >= 0.15
+	assert not tracker.pending_requests(page)  # type: ignore
+
+
+async def test_times_out_with_requests_in_flight():
+	context = FakeContext()
+	tracker = NetworkTracker()
+	tracker.attach(context)  # type: ignore
+	page = object()
+	context.listeners['request'](FakeRequest(page, 'https://example.com/slow.css', 'stylesheet'))
+
+	assert not await tracker.wait_for_idle(page, idle_time=0.01, timeout=0.05)  # type: ignore
+
+
+def test_ignored_url_patterns():
+	assert IGNORED_URL_RE.search('https://stats.example.com/beacon?id=1')
+	assert not IGNORED_URL_RE.search('https://example.com/checkout')
+
+
+async def test_blocked_requests_are_counted():
+	context = FakeContext()
+	blocker = RequestBlocker(block_trackers=True, stub_images=True)
+	await blocker.attach(context)  # type: ignore
+	(resource_pattern, handle_resource), (tracker_pattern, handle_tracker) = context.routes
+
+	assert tracker_pattern is BLOCKED_URL_RE
+	assert BLOCKED_URL_RE.search('https://www.googletagmanager.com/gtm.js?id=1')
+	assert not BLOCKED_URL_RE.search('https://example.com/?ref=doubleclick.net')
+
+	routes = [
+		FakeRoute(FakeRequest(None, 'https://example.com/logo.png', 'image')),
+		FakeRoute(FakeRequest(None, 'https://example.com/intro.mp4', 'media')),
+	]
+	for route in routes:
+		await handle_resource(route)
+	tracker = FakeRoute(FakeRequest(None, 'https://www.google-analytics.com/collect'))
+	await handle_tracker(tracker)
+
+	assert [route.outcome for route in routes] == [TRANSPARENT_GIF, 'fallback']
+	assert tracker.outcome == 'abort'
+	assert blocker.blocked == {'image': 1, 'tracker': 1}
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Optional
 
 from pydantic import BaseModel
 
+from browser_use.browser.screenshots import screenshot_to_base64
 from browser_use.dom.history_tree_processor.service import DOMHistoryElement
 from browser_use.dom.views import DOMState
 
@@ -21,7 +22,13 @@ class BrowserState(DOMState):
 	url: str
 	title: str
 	tabs: list[TabInfo]
-	screenshot: Optional[str] = None
+	# Raw image bytes, base64 encoded only where a message or JSON needs it
+	screenshot: Optional[bytes] = None
+	# The screenshot looks like the one sent with the previous state, the prompt leaves it out
+	screenshot_unchanged: bool = field(default=False, kw_only=True)
+	# Scroll position of the page, in CSS pixels above and below the viewport
+	pixels_above: int = field(default=0, kw_only=True)
+	pixels_below: int = field(default=0, kw_only=True)
 
 
 @dataclass
@@ -30,12 +37,12 @@ class BrowserStateHistory:
 	title: str
 	tabs: list[TabInfo]
 	interacted_element: list[DOMHistoryElement | None] | list[None]
-	screenshot: Optional[str] = None
+	screenshot: Optional[bytes] = None
 
 	def to_dict(self) -> dict[str, Any]:
 		data = {}
 		data['tabs'] = [tab.model_dump() for tab in self.tabs]
-		data['screenshot'] = self.screenshot
+		data['screenshot'] = screenshot_to_base64(self.screenshot) if self.screenshot else None
 		data['interacted_element'] = [
 			el.to_dict() if el else None for el in self.interacted_element
 		]
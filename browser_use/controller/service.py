@@ -483,18 +483,11 @@ class Controller:
 		"""Execute multiple actions"""
 		results = []
 
-		session = await browser_context.get_session()
-		cached_selector_map = session.cached_state.selector_map
-		cached_path_hashes = set(e.hash.branch_path_hash for e in cached_selector_map.values())
 		await browser_context.remove_highlights()
 
 		for i, action in enumerate(actions):
 			if action.get_index() is not None and i != 0:
-				new_state = await browser_context.get_state()
-				new_path_hashes = set(
-					e.hash.branch_path_hash for e in new_state.selector_map.values()
-				)
-				if not new_path_hashes.issubset(cached_path_hashes):
+				if await browser_context.has_new_interactive_elements():
 					# next action requires index but there are new elements on the page
 					logger.info(f'Something new appeared after action {i } / {len(actions)}')
 					break
@@ -505,8 +498,9 @@ class Controller:
 			if results[-1].is_done or results[-1].error or i == len(actions) - 1:
 				break
 
-			await asyncio.sleep(browser_context.config.wait_between_actions)
-			# hash all elements. if it is a subset of cached_state its fine - else break (new elements on page)
+			# Replayed responses come from a HAR file, there is nothing to wait for
+			if browser_context.config.replay_har_path is None:
+				await asyncio.sleep(browser_context.config.wait_between_actions)
 
 		return results
 
@@ -1,14 +1,113 @@
 (
-    doHighlightElements = true
+    args = {
+        doHighlightElements: true,
+        incremental: false,
+        epoch: null,
+        flat: false,
+        viewportExpansion: null,
+        pruneInvisible: false,
+        frameElements: null,
+        serialize: false,
+        fingerprintOnly: false,
+        highlightBoxes: false,
+        removeHighlights: false,
+        pageInfo: false,
+    }
 ) => {
+    const {
+        doHighlightElements = true,
+        incremental = false,
+        epoch = null,
+        flat = false,
+        viewportExpansion = null,
+        pruneInvisible = false,
+        // <iframe> elements of frames the caller extracts separately, their content is not walked
+        frameElements = null,
+        // Return a JSON string, which crosses the protocol without Playwright's per-value serializer
+        serialize = false,
+        // Only report how many highlighted elements are new since the last extraction
+        fingerprintOnly = false,
+        // Return the boxes of highlighted elements in screenshot pixels instead of drawing them
+        highlightBoxes = false,
+        // Remove the highlights of the previous extraction before walking the page
+        removeHighlights = false,
+        // Also return the URL, title and scroll position of the page
+        pageInfo = false,
+    } = args;
     let highlightIndex = 0; // Reset highlight index
+    // Whether highlighted elements are queued, to be drawn or measured after the walk
+    let drawHighlights = doHighlightElements || highlightBoxes;
+
+    const HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container';
+    const HIGHLIGHT_ATTRIBUTE = 'browser-user-highlight-id';
+
+    // Highlights are queued during the walk and written in one batch afterwards.
+    // Interleaving DOM writes with the style and geometry reads of the walk would
+    // force a style and layout recalculation for every element.
+    const pendingHighlights = [];
 
     function highlightElement(element, index, parentIframe = null) {
-        // Create or get highlight container
-        let container = document.getElementById('playwright-highlight-container');
+        pendingHighlights.push({ element, index, parentIframe });
+        return index + 1;
+    }
+
+    // Flat [index, left, top, width, height, ...] of the highlighted elements in screenshot pixels
+    const boxes = [];
+
+    function flushHighlights() {
+        const count = pendingHighlights.length;
+        if (count === 0) return;
+
+        // Read phase: geometry of all highlighted elements while the layout is still clean
+        const geometry = new Float64Array(count * 4); // top, left, width, height
+        const iframeOffsets = new Map();
+        for (let i = 0; i < count; i++) {
+            const { element, parentIframe } = pendingHighlights[i];
+            const rect = element.getBoundingClientRect();
+            let top = rect.top;
+            let left = rect.left;
+
+            // Adjust position if element is inside an iframe
+            if (parentIframe) {
+                let offset = iframeOffsets.get(parentIframe);
+                if (!offset) {
+                    const iframeRect = parentIframe.getBoundingClientRect();
+                    offset = [iframeRect.top, iframeRect.left];
+                    iframeOffsets.set(parentIframe, offset);
+                }
+                top += offset[0];
+                left += offset[1];
+            }
+
+            geometry[i * 4] = top;
+            geometry[i * 4 + 1] = left;
+            geometry[i * 4 + 2] = rect.width;
+            geometry[i * 4 + 3] = rect.height;
+        }
+        const viewportWidth = window.innerWidth;
+
+        if (highlightBoxes) {
+            const scale = window.devicePixelRatio || 1;
+            for (let i = 0; i < count; i++) {
+                boxes.push(
+                    pendingHighlights[i].index,
+                    geometry[i * 4 + 1] * scale,
+                    geometry[i * 4] * scale,
+                    geometry[i * 4 + 2] * scale,
+                    geometry[i * 4 + 3] * scale
+                );
+            }
+        }
+        if (!doHighlightElements) {
+            pendingHighlights.length = 0;
+            return;
+        }
+
+        // Write phase: build all overlays off-document and attach them at once
+        let container = document.getElementById(HIGHLIGHT_CONTAINER_ID);
         if (!container) {
             container = document.createElement('div');
-            container.id = 'playwright-highlight-container';
+            container.id = HIGHLIGHT_CONTAINER_ID;
             container.style.position = 'fixed';
             container.style.pointerEvents = 'none';
             container.style.top = '0';
@@ -16,7 +115,6 @@
             container.style.width = '100%';
             container.style.height = '100%';
             container.style.zIndex = '2147483647'; // Maximum z-index value
-            document.documentElement.appendChild(container);
         }
 
         // Generate a color based on the index
@@ -25,79 +123,79 @@
             '#800080', '#008080', '#FF69B4', '#4B0082',
             '#FF4500', '#2E8B57', '#DC143C', '#4682B4'
         ];
-        const colorIndex = index % colors.length;
-        const baseColor = colors[colorIndex];
-        const backgroundColor = `${baseColor}1A`; // 10% opacity version of the color
-
-        // Create highlight overlay
-        const overlay = document.createElement('div');
-        overlay.style.position = 'absolute';
-        overlay.style.border = `2px solid ${baseColor}`;
-        overlay.style.backgroundColor = backgroundColor;
-        overlay.style.pointerEvents = 'none';
-        overlay.style.boxSizing = 'border-box';
-
-        // Position overlay based on element
-        const rect = element.getBoundingClientRect();
-        let top = rect.top;
-        let left = rect.left;
-
-        // Adjust position if element is inside an iframe
-        if (parentIframe) {
-            const iframeRect = parentIframe.getBoundingClientRect();
-            top += iframeRect.top;
-            left += iframeRect.left;
-        }
-
-        overlay.style.top = `${top}px`;
-        overlay.style.left = `${left}px`;
-        overlay.style.width = `${rect.width}px`;
-        overlay.style.height = `${rect.height}px`;
-
-        // Create label
-        const label = document.createElement('div');
-        label.className = 'playwright-highlight-label';
-        label.style.position = 'absolute';
-        label.style.background = baseColor;
-        label.style.color = 'white';
-        label.style.padding = '1px 4px';
-        label.style.borderRadius = '4px';
-        label.style.fontSize = `${Math.min(12, Math.max(8, rect.height / 2))}px`; // Responsive font size
-        label.textContent = index;
-
-        // Calculate label position
-        const labelWidth = 20; // Approximate width
-        const labelHeight = 16; // Approximate height
-        
-        // Default position (top-right corner inside the box)
-        let labelTop = top + 2;
-        let labelLeft = left + rect.width - labelWidth - 2;
-
-        // Adjust if box is too small
-        if (rect.width < labelWidth + 4 || rect.height < labelHeight + 4) {
-            // Position outside the box if it's too small
-            labelTop = top - labelHeight - 2;
-            labelLeft = left + rect.width - labelWidth;
-        }
-
-        // Ensure label stays within viewport
-        if (labelTop < 0) labelTop = top + 2;
-        if (labelLeft < 0) labelLeft = left + 2;
-        if (labelLeft + labelWidth > window.innerWidth) {
-            labelLeft = left + rect.width - labelWidth - 2;
-        }
-
-        label.style.top = `${labelTop}px`;
-        label.style.left = `${labelLeft}px`;
-
-        // Add to container
-        container.appendChild(overlay);
-        container.appendChild(label);
-
-        // Store reference for cleanup
-        element.setAttribute('browser-user-highlight-id', `playwright-highlight-${index}`);
 
-        return index + 1;
+        const fragment = document.createDocumentFragment();
+        for (let i = 0; i < count; i++) {
+            const { element, index } = pendingHighlights[i];
+            const top = geometry[i * 4];
+            const left = geometry[i * 4 + 1];
+            const width = geometry[i * 4 + 2];
+            const height = geometry[i * 4 + 3];
+
+            const colorIndex = index % colors.length;
+            const baseColor = colors[colorIndex];
+            const backgroundColor = `${baseColor}1A`; // 10% opacity version of the color
+
+            // Create highlight overlay
+            const overlay = document.createElement('div');
+            overlay.style.position = 'absolute';
+            overlay.style.border = `2px solid ${baseColor}`;
+            overlay.style.backgroundColor = backgroundColor;
+            overlay.style.pointerEvents = 'none';
+            overlay.style.boxSizing = 'border-box';
+            overlay.style.top = `${top}px`;
+            overlay.style.left = `${left}px`;
+            overlay.style.width = `${width}px`;
+            overlay.style.height = `${height}px`;
+
+            // Create label
+            const label = document.createElement('div');
+            label.className = 'playwright-highlight-label';
+            label.style.position = 'absolute';
+            label.style.background = baseColor;
+            label.style.color = 'white';
+            label.style.padding = '1px 4px';
+            label.style.borderRadius = '4px';
+            label.style.fontSize = `${Math.min(12, Math.max(8, height / 2))}px`; // Responsive font size
+            label.textContent = index;
+
+            // Calculate label position
+            const labelWidth = 20; // Approximate width
+            const labelHeight = 16; // Approximate height
+
+            // Default position (top-right corner inside the box)
+            let labelTop = top + 2;
+            let labelLeft = left + width - labelWidth - 2;
+
+            // Adjust if box is too small
+            if (width < labelWidth + 4 || height < labelHeight + 4) {
+                // Position outside the box if it's too small
+                labelTop = top - labelHeight - 2;
+                labelLeft = left + width - labelWidth;
+            }
+
+            // Ensure label stays within viewport
+            if (labelTop < 0) labelTop = top + 2;
+            if (labelLeft < 0) labelLeft = left + 2;
+            if (labelLeft + labelWidth > viewportWidth) {
+                labelLeft = left + width - labelWidth - 2;
+            }
+
+            label.style.top = `${labelTop}px`;
+            label.style.left = `${labelLeft}px`;
+
+            fragment.appendChild(overlay);
+            fragment.appendChild(label);
+
+            // Store reference for cleanup
+            element.setAttribute(HIGHLIGHT_ATTRIBUTE, `playwright-highlight-${index}`);
+        }
+
+        container.appendChild(fragment);
+        if (!container.isConnected) {
+            document.documentElement.appendChild(container);
+        }
+        pendingHighlights.length = 0;
     }
 
 
@@ -132,6 +230,49 @@
         return segments.join('/');
     }
 
+    // XPaths are built top-down during the walk: each child extends the path of its parent,
+    // and the sibling index comes from a per-tag counter of the parent's children.
+    // getXPathTree is only needed for the node the walk starts at.
+    function getXPathSegment(element, siblingCounts) {
+        const index = siblingCounts.get(element.nodeName) || 0;
+        siblingCounts.set(element.nodeName, index + 1);
+        const tagName = element.nodeName.toLowerCase();
+        return index > 0 ? `${tagName}[${index + 1}]` : tagName;
+    }
+
+    function joinXPath(parentXPath, segment) {
+        return parentXPath ? `${parentXPath}/${segment}` : segment;
+    }
+
+    // Viewport-scoped extraction: elements further than `viewportExpansion` viewports away
+    // from the current one are not walked, only their interactive elements are counted.
+    const viewportRange = viewportExpansion === null ? null : {
+        top: -viewportExpansion * window.innerHeight,
+        bottom: (1 + viewportExpansion) * window.innerHeight,
+    };
+    // Cheap approximation of isInteractiveElement for the counts of skipped subtrees
+    const INTERACTIVE_SELECTOR = [
+        'a', 'button', 'details', 'embed', 'input', 'label', 'menu', 'menuitem', 'object',
+        'select', 'textarea', 'summary', '[role]', '[onclick]', '[tabindex]:not([tabindex="-1"])',
+    ].join(', ');
+    const offscreen = { above: 0, below: 0 };
+
+    function getOffscreenDirection(element, parentIframe) {
+        // Iframe content is positioned relative to the iframe, its iframe element decides
+        if (!viewportRange || parentIframe) return null;
+        const rect = element.getBoundingClientRect();
+        // Collapsed containers can still hold positioned children
+        if (rect.width === 0 && rect.height === 0) return null;
+        if (rect.bottom < viewportRange.top) return 'above';
+        if (rect.top > viewportRange.bottom) return 'below';
+        return null;
+    }
+
+    function countInteractiveElements(element) {
+        return (element.matches(INTERACTIVE_SELECTOR) ? 1 : 0) +
+            element.querySelectorAll(INTERACTIVE_SELECTOR).length;
+    }
+
     // Helper function to check if element is accepted
     function isElementAccepted(element) {
         const leafElementDenyList = new Set(['svg', 'script', 'style', 'link', 'meta']);
@@ -139,7 +280,7 @@
     }
 
     // Helper function to check if element is interactive
-    function isInteractiveElement(element) {
+    function isInteractiveElement(element, style) {
         // Base interactive elements and roles
         const interactiveElements = new Set([
             'a', 'button', 'details', 'embed', 'input', 'label',
@@ -169,9 +310,6 @@
 
         if (hasInteractiveRole) return true;
 
-        // Get computed style
-        const style = window.getComputedStyle(element);
-
         // Check if element has click-like styling
         // const hasClickStyling = style.cursor === 'pointer' ||
         //     element.style.cursor === 'pointer' ||
@@ -249,8 +387,7 @@
     }
 
     // Helper function to check if element is visible
-    function isElementVisible(element) {
-        const style = window.getComputedStyle(element);
+    function isElementVisible(element, style = window.getComputedStyle(element)) {
         return element.offsetWidth > 0 &&
             element.offsetHeight > 0 &&
             style.visibility !== 'hidden' &&
@@ -326,8 +463,271 @@
     }
 
 
+    // Incremental snapshots: the extractor state is kept on the window between calls.
+    // A MutationObserver collects the nodes that changed since the last snapshot so
+    // only their subtrees have to be walked again.
+    const OBSERVER_OPTIONS = { subtree: true, childList: true, attributes: true, characterData: true };
+    const MAX_DIRTY_ROOTS = 200;
+
+    function createIncrementalState() {
+        const state = {
+            epoch: `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`,
+            root: null,
+            viewport: null,
+            nextId: 0,
+            ids: new WeakMap(), // element -> node id
+            frames: new WeakMap(), // element -> parent iframe
+            highlights: new Map(), // highlight index -> element
+            highlightIndices: new WeakMap(), // element -> last highlight index
+            nextHighlightIndex: 0,
+            occluded: new Set(), // interactive and visible, but covered by another element
+            offscreen: new Map(), // element outside of the viewport range -> { direction, count }
+            dirty: new Set(),
+            layout: new Map(), // highlighted element -> rounded bounding box
+            hovered: null,
+            focused: null,
+            observer: null,
+        };
+        state.observer = new MutationObserver(records => collectMutations(state, records));
+        return state;
+    }
+
+    function isHighlightNode(node) {
+        const element = node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+        return !!element?.closest?.(`#${HIGHLIGHT_CONTAINER_ID}`);
+    }
+
+    function isOwnMutation(record) {
+        if (record.type === 'attributes') {
+            return record.attributeName === HIGHLIGHT_ATTRIBUTE || isHighlightNode(record.target);
+        }
+        if (isHighlightNode(record.target)) return true;
+        if (record.type === 'childList') {
+            const nodes = [...record.addedNodes, ...record.removedNodes];
+            return nodes.length > 0 && nodes.every(node => node.id === HIGHLIGHT_CONTAINER_ID);
+        }
+        return false;
+    }
+
+    function collectMutations(state, records) {
+        for (const record of records) {
+            if (!isOwnMutation(record)) {
+                state.dirty.add(record.target);
+            }
+        }
+    }
+
+    function parentAcrossBoundaries(node) {
+        if (node.parentNode) return node.parentNode instanceof ShadowRoot ? node.parentNode.host : node.parentNode;
+        if (node instanceof ShadowRoot) return node.host;
+        if (node.nodeType === Node.DOCUMENT_NODE) return node.defaultView?.frameElement || null;
+        return null;
+    }
+
+    function isInside(ancestor, node) {
+        for (let current = node; current; current = parentAcrossBoundaries(current)) {
+            if (current === ancestor) return true;
+        }
+        return false;
+    }
+
+    function getViewportKey() {
+        return [window.scrollX, window.scrollY, window.innerWidth, window.innerHeight].join(',');
+    }
+
+    // Returns the outermost changed elements of the last snapshot, or null if a full walk is needed
+    function findDirtyRoots(state) {
+        const roots = new Set();
+        for (const node of state.dirty) {
+            let current = node;
+            while (current && !(current.nodeType === Node.ELEMENT_NODE && state.ids.has(current))) {
+                current = parentAcrossBoundaries(current);
+            }
+            // Detached nodes are covered by the childList record of their old parent. Changes
+            // outside of the walked tree (a class on <html>, a <style> in <head>) can restyle
+            // all of it.
+            if (!current) {
+                if (node.isConnected) return null;
+                continue;
+            }
+            if (!current.isConnected) continue;
+            if (current === state.root) return null;
+            roots.add(current);
+        }
+        if (roots.size > MAX_DIRTY_ROOTS) return null;
+
+        const candidates = [...roots];
+        return candidates.filter(root =>
+            !candidates.some(other => other !== root && isInside(other, root))
+        );
+    }
+
+    // A change outside of the dirty subtrees can still cover or reveal other elements
+    function highlightsStillValid(state) {
+        for (const element of state.highlights.values()) {
+            if (!element.isConnected || !isElementVisible(element) || !isTopElement(element)) {
+                return false;
+            }
+        }
+        for (const element of state.occluded) {
+            if (element.isConnected && isElementVisible(element) && isTopElement(element)) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    // Layout changes that cause no mutation: scrolled containers, :hover and :focus styles
+    function getLastHovered() {
+        const hovered = document.querySelectorAll(':hover');
+        return hovered.length > 0 ? hovered[hovered.length - 1] : null;
+    }
+
+    function getBoxKey(element) {
+        const rect = element.getBoundingClientRect();
+        return [rect.left, rect.top, rect.width, rect.height].map(Math.round).join(',');
+    }
+
+    function recordLayout(state) {
+        state.layout = new Map();
+        for (const element of state.highlights.values()) {
+            state.layout.set(element, getBoxKey(element));
+        }
+        state.hovered = getLastHovered();
+        state.focused = document.activeElement;
+    }
+
+    // Only checks the highlights outside of the dirty subtrees, those are walked again anyway
+    function layoutUnchanged(state) {
+        if (getLastHovered() !== state.hovered || document.activeElement !== state.focused) {
+            return false;
+        }
+        for (const element of state.highlights.values()) {
+            if (state.layout.get(element) !== getBoxKey(element)) return false;
+        }
+        return true;
+    }
+
+    function forgetSubtree(state, root) {
+        for (const [index, element] of state.highlights) {
+            if (isInside(root, element)) state.highlights.delete(index);
+        }
+        for (const element of state.occluded) {
+            if (isInside(root, element)) state.occluded.delete(element);
+        }
+        for (const element of state.offscreen.keys()) {
+            if (isInside(root, element)) state.offscreen.delete(element);
+        }
+    }
+
+    function countOffscreen(state) {
+        const counts = { above: 0, below: 0 };
+        for (const { direction, count } of state.offscreen.values()) {
+            counts[direction] += count;
+        }
+        return counts;
+    }
+
+    function claimHighlightIndex(element) {
+        const state = incrementalState;
+        let index = state.highlightIndices.get(element);
+        if (index === undefined || state.highlights.has(index)) {
+            index = state.nextHighlightIndex++;
+        }
+        state.highlightIndices.set(element, index);
+        state.highlights.set(index, element);
+        return index;
+    }
+
+    function trackElement(nodeData, element, parentIframe) {
+        const state = incrementalState;
+        let id = state.ids.get(element);
+        if (id === undefined) {
+            id = state.nextId++;
+            state.ids.set(element, id);
+        }
+        if (parentIframe) state.frames.set(element, parentIframe);
+        nodeData.id = id;
+    }
+
+    function redrawHighlights(state) {
+        for (const [index, element] of state.highlights) {
+            highlightElement(element, index, state.frames.get(element) || null);
+        }
+    }
+
+    let incrementalState = null;
+
+    // Change tracking for cheap checks between actions: a mutation counter and the tag paths of
+    // the elements highlighted by the last extraction
+    let changeTracker = null;
+    const highlightedElements = [];
+
+    function getChangeTracker() {
+        window.__browserUse = window.__browserUse || {};
+        let tracker = window.__browserUse.changeTracker;
+        if (!tracker) {
+            tracker = { mutations: 0, checkedMutations: 0, baseline: null, observer: null };
+            tracker.observer = new MutationObserver(records => countMutations(tracker, records));
+            tracker.observer.observe(document, OBSERVER_OPTIONS);
+            window.__browserUse.changeTracker = tracker;
+        }
+        return tracker;
+    }
+
+    function countMutations(tracker, records) {
+        for (const record of records) {
+            if (!isOwnMutation(record)) tracker.mutations++;
+        }
+    }
+
+    function getTagPath(element) {
+        const tags = [];
+        for (let current = element; current; current = parentAcrossBoundaries(current)) {
+            if (current.nodeType === Node.ELEMENT_NODE) tags.push(current.tagName);
+        }
+        return tags.reverse().join('/');
+    }
+
+    function countNewElements() {
+        const tracker = window.__browserUse?.changeTracker;
+        if (!tracker?.baseline) {
+            // Nothing to compare against, e.g. after a navigation
+            return { newElements: null };
+        }
+        countMutations(tracker, tracker.observer.takeRecords());
+        if (tracker.mutations === tracker.checkedMutations) {
+            return { newElements: 0 };
+        }
+
+        drawHighlights = false;
+        walk(document.body);
+        const newElements = highlightedElements.filter(element => !tracker.baseline.has(getTagPath(element))).length;
+        if (newElements === 0) {
+            // Unchanged since this check, the next one can skip the walk
+            tracker.checkedMutations = tracker.mutations;
+        }
+        return { newElements };
+    }
+
+    // Root of the current walk, never pruned so the caller always gets a node back
+    let walkRoot = null;
+
+    function walk(root, parentIframe = null) {
+        walkRoot = root;
+        return buildDomTree(root, parentIframe);
+    }
+
+    // Pruned elements are not part of the snapshot, so mutations inside them
+    // have to be attributed to the closest ancestor that is
+    function untrackElement(element) {
+        if (!incrementalState) return;
+        incrementalState.ids.delete(element);
+        incrementalState.frames.delete(element);
+    }
+
     // Function to traverse the DOM and create nested JSON
-    function buildDomTree(node, parentIframe = null) {
+    function buildDomTree(node, parentIframe = null, xpath = null) {
         if (!node) return null;
 
         // Special case for text nodes
@@ -351,7 +751,7 @@
         const nodeData = {
             tagName: node.tagName ? node.tagName.toLowerCase() : null,
             attributes: {},
-            xpath: node.nodeType === Node.ELEMENT_NODE ? getXPathTree(node, true) : null,
+            xpath: node.nodeType === Node.ELEMENT_NODE ? (xpath ?? getXPathTree(node, true)) : null,
             children: [],
         };
 
@@ -365,18 +765,53 @@
         }
 
         if (node.nodeType === Node.ELEMENT_NODE) {
-            const isInteractive = isInteractiveElement(node);
-            const isVisible = isElementVisible(node);
-            const isTop = isTopElement(node);
+            const direction = getOffscreenDirection(node, parentIframe);
+            if (direction) {
+                // Kept as an empty element so xpaths and iframe lookups of its ancestors still resolve
+                const count = countInteractiveElements(node);
+                offscreen[direction] += count;
+                if (incrementalState) {
+                    trackElement(nodeData, node, parentIframe);
+                    incrementalState.offscreen.set(node, { direction, count });
+                }
+                nodeData.isInteractive = false;
+                nodeData.isVisible = false;
+                nodeData.isTopElement = false;
+                return nodeData;
+            }
+
+            // Computed style is read once per element and shared by both checks
+            const style = window.getComputedStyle(node);
+
+            // Nothing below display:none is rendered, the subtree is skipped without walking it
+            if (pruneInvisible && style.display === 'none' && node !== walkRoot) {
+                untrackElement(node);
+                return null;
+            }
+
+            const isInteractive = isInteractiveElement(node, style);
+            const isVisible = isElementVisible(node, style);
+            // Hit testing is the most expensive check, only candidates for highlighting need it
+            const isTop = isInteractive && isVisible && isTopElement(node);
+            timings.elements++;
+            if (isInteractive && isVisible) timings.topChecks++;
 
             nodeData.isInteractive = isInteractive;
             nodeData.isVisible = isVisible;
             nodeData.isTopElement = isTop;
 
+            if (incrementalState) {
+                trackElement(nodeData, node, parentIframe);
+                if (isInteractive && isVisible && !isTop) {
+                    incrementalState.occluded.add(node);
+                }
+            }
+
             // Highlight if element meets all criteria and highlighting is enabled
             if (isInteractive && isVisible && isTop) {
-                nodeData.highlightIndex = highlightIndex++;
-                if (doHighlightElements) {
+                nodeData.highlightIndex = incrementalState ? claimHighlightIndex(node) : highlightIndex++;
+                highlightedElements.push(node);
+                if (drawHighlights) {
                     highlightElement(node, nodeData.highlightIndex, parentIframe);
                 }
             }
@@ -394,19 +829,40 @@
 
         // Handle shadow DOM
         if (node.shadowRoot) {
-            const shadowChildren = Array.from(node.shadowRoot.childNodes).map(child =>
-                buildDomTree(child, parentIframe)
-            );
+            incrementalState?.observer.observe(node.shadowRoot, OBSERVER_OPTIONS);
+            changeTracker?.observer.observe(node.shadowRoot, OBSERVER_OPTIONS);
+            // XPaths restart at shadow roots; getXPathTree only detects roots of this window's realm
+            const isBoundary = node.shadowRoot instanceof ShadowRoot;
+            const siblingCounts = new Map();
+            const shadowChildren = Array.from(node.shadowRoot.childNodes).map(child => {
+                if (child.nodeType !== Node.ELEMENT_NODE) return buildDomTree(child, parentIframe);
+                const segment = getXPathSegment(child, siblingCounts);
+                return buildDomTree(child, parentIframe, isBoundary ? '' : segment);
+            });
             nodeData.children.push(...shadowChildren);
         }
 
         // Handle iframes
-        if (node.tagName === 'IFRAME') {
+        if (node.tagName === 'IFRAME' && frameElements) {
+            // Extracted in its own frame by the caller and attached at this node
+            const frameIndex = frameElements.indexOf(node);
+            if (frameIndex >= 0) {
+                nodeData.frameIndex = frameIndex;
+            }
+        } else if (node.tagName === 'IFRAME') {
             try {
                 const iframeDoc = node.contentDocument || node.contentWindow.document;
                 if (iframeDoc) {
+                    incrementalState?.observer.observe(iframeDoc, OBSERVER_OPTIONS);
+                    changeTracker?.observer.observe(iframeDoc, OBSERVER_OPTIONS);
+                    const bodyXPath = getXPathTree(iframeDoc.body, true);
+                    const siblingCounts = new Map();
                     const iframeChildren = Array.from(iframeDoc.body.childNodes).map(child =>
-                        buildDomTree(child, node)
+                        buildDomTree(
+                            child,
+                            node,
+                            child.nodeType === Node.ELEMENT_NODE ? joinXPath(bodyXPath, getXPathSegment(child, siblingCounts)) : null
+                        )
                     );
                     nodeData.children.push(...iframeChildren);
                 }
@@ -414,15 +870,223 @@
                 console.warn('Unable to access iframe:', node);
             }
         } else {
+            const nodeXPath = nodeData.xpath;
+            const siblingCounts = new Map();
             const children = Array.from(node.childNodes).map(child =>
-                buildDomTree(child, parentIframe)
+                buildDomTree(
+                    child,
+                    parentIframe,
+                    child.nodeType === Node.ELEMENT_NODE ? joinXPath(nodeXPath, getXPathSegment(child, siblingCounts)) : null
+                )
             );
             nodeData.children.push(...children);
         }
 
+        // Invisible subtrees without anything visible or highlighted in them are dropped.
+        // XPaths are built top-down, so removing them does not change the paths of other nodes.
+        if (pruneInvisible && node.nodeType === Node.ELEMENT_NODE && node !== walkRoot &&
+            !nodeData.isVisible && nodeData.highlightIndex === undefined &&
+            !nodeData.children.some(child => child)) {
+            untrackElement(node);
+            return null;
+        }
+
         return nodeData;
     }
 
 
-    return buildDomTree(document.body);
+    // Flat wire format: parallel arrays in document order instead of one nested object.
+    // Strings (tag names, attributes, xpaths, texts) are interned into a single table.
+    const FLAG_VISIBLE = 1;
+    const FLAG_INTERACTIVE = 2;
+    const FLAG_TOP = 4;
+    const FLAG_SHADOW_ROOT = 8;
+    const FLAG_TEXT = 16;
+
+    function flattenTree(tree) {
+        const strings = [];
+        const stringIndices = new Map();
+        function intern(value) {
+            let index = stringIndices.get(value);
+            if (index === undefined) {
+                index = strings.length;
+                strings.push(value);
+                stringIndices.set(value, index);
+            }
+            return index;
+        }
+
+        const result = {
+            format: 'flat',
+            strings,
+            parent: [], // index of the parent node, -1 for the root
+            name: [], // tag name for elements, text content for text nodes
+            xpath: [],
+            flags: [],
+            highlight: [], // highlight index, -1 if not highlighted
+            id: [], // node id of incremental snapshots, -1 if not tracked
+            frame: [], // index into frameElements for separately extracted iframes, -1 otherwise
+            attrOffsets: [0], // attributes of node i are attrs[2 * attrOffsets[i]..2 * attrOffsets[i + 1]]
+            attrs: [], // interned name, value pairs
+        };
+
+        const stack = [[tree, -1]];
+        while (stack.length > 0) {
+            const [node, parentIndex] = stack.pop();
+            const index = result.parent.length;
+            result.parent.push(parentIndex);
+
+            if (node.type === 'TEXT_NODE') {
+                result.name.push(intern(node.text));
+                result.xpath.push(-1);
+                result.flags.push(FLAG_TEXT | (node.isVisible ? FLAG_VISIBLE : 0));
+                result.highlight.push(-1);
+                result.id.push(-1);
+                result.frame.push(-1);
+            } else {
+                result.name.push(intern(node.tagName));
+                result.xpath.push(intern(node.xpath));
+                result.flags.push(
+                    (node.isVisible ? FLAG_VISIBLE : 0) |
+                    (node.isInteractive ? FLAG_INTERACTIVE : 0) |
+                    (node.isTopElement ? FLAG_TOP : 0) |
+                    (node.shadowRoot ? FLAG_SHADOW_ROOT : 0)
+                );
+                result.highlight.push(node.highlightIndex ?? -1);
+                result.id.push(node.id ?? -1);
+                result.frame.push(node.frameIndex ?? -1);
+                for (const [name, value] of Object.entries(node.attributes)) {
+                    result.attrs.push(intern(name), intern(value));
+                }
+            }
+            result.attrOffsets.push(result.attrs.length / 2);
+
+            // Push in reverse so children are emitted in document order
+            const children = node.children || [];
+            for (let i = children.length - 1; i >= 0; i--) {
+                if (children[i]) stack.push([children[i], index]);
+            }
+        }
+        return result;
+    }
+
+    function encode(tree) {
+        return flat && tree ? flattenTree(tree) : tree;
+    }
+
+    function buildFullSnapshot() {
+        const state = createIncrementalState();
+        window.__browserUse = window.__browserUse || {};
+        window.__browserUse.incrementalState?.observer.disconnect();
+        window.__browserUse.incrementalState = state;
+
+        incrementalState = state;
+        state.root = document.body;
+        state.viewport = getViewportKey();
+        state.observer.observe(document, OBSERVER_OPTIONS);
+        const tree = walk(document.body);
+        recordLayout(state);
+        state.observer.takeRecords();
+        return { mode: 'full', epoch: state.epoch, tree: encode(tree), offscreen: countOffscreen(state) };
+    }
+
+    function buildIncrementalSnapshot() {
+        const state = window.__browserUse?.incrementalState;
+        if (!state || state.epoch !== epoch || state.root !== document.body ||
+            state.viewport !== getViewportKey()) {
+            return buildFullSnapshot();
+        }
+
+        collectMutations(state, state.observer.takeRecords());
+        const roots = findDirtyRoots(state);
+        if (roots === null) {
+            return buildFullSnapshot();
+        }
+
+        for (const root of roots) {
+            forgetSubtree(state, root);
+        }
+        if (!layoutUnchanged(state)) {
+            return buildFullSnapshot();
+        }
+
+        incrementalState = state;
+        drawHighlights = false;
+        const patches = roots.map(root => {
+            const node = walk(root, state.frames.get(root) || null);
+            return { id: state.ids.get(root), node: encode(node) };
+        });
+        state.dirty.clear();
+
+        if (!highlightsStillValid(state)) {
+            drawHighlights = doHighlightElements || highlightBoxes;
+            return buildFullSnapshot();
+        }
+        if (doHighlightElements || highlightBoxes) {
+            redrawHighlights(state);
+        }
+        recordLayout(state);
+        state.observer.takeRecords();
+
+        if (patches.length === 0) {
+            return { mode: 'unchanged', epoch: state.epoch, offscreen: countOffscreen(state) };
+        }
+        return { mode: 'patch', epoch: state.epoch, patches, offscreen: countOffscreen(state) };
+    }
+
+    // In-page timing counters, read with DomService.get_extraction_timings()
+    const timings = { elements: 0, topChecks: 0, highlights: 0, walkMs: 0, highlightMs: 0 };
+
+    if (fingerprintOnly) {
+        return countNewElements();
+    }
+
+    if (removeHighlights) {
+        document.getElementById(HIGHLIGHT_CONTAINER_ID)?.remove();
+        for (const element of document.querySelectorAll(`[${HIGHLIGHT_ATTRIBUTE}^="playwright-highlight-"]`)) {
+            element.removeAttribute(HIGHLIGHT_ATTRIBUTE);
+        }
+    }
+
+    const walkStart = performance.now();
+    changeTracker = getChangeTracker();
+
+    let result;
+    if (incremental) {
+        result = buildIncrementalSnapshot();
+    } else {
+        result = encode(walk(document.body));
+        if (viewportRange) result.offscreen = offscreen;
+    }
+
+    const highlightStart = performance.now();
+    timings.highlights = pendingHighlights.length;
+    flushHighlights();
+    timings.walkMs = highlightStart - walkStart;
+    timings.highlightMs = performance.now() - highlightStart;
+    if (highlightBoxes && result) {
+        result.highlightBoxes = boxes;
+    }
+    if (pageInfo && result) {
+        const scrollingElement = document.scrollingElement || document.documentElement;
+        result.page = {
+            url: window.location.href,
+            title: document.title,
+            scrollY: window.scrollY,
+            scrollHeight: scrollingElement ? scrollingElement.scrollHeight : 0,
+            viewportHeight: window.innerHeight,
+        };
+    }
+
+    // Baseline of the next countNewElements() call
+    const baselineElements = incremental ? window.__browserUse.incrementalState.highlights.values() : highlightedElements;
+    changeTracker.baseline = new Set(Array.from(baselineElements, getTagPath));
+    changeTracker.observer.takeRecords();
+    changeTracker.mutations = 0;
+    changeTracker.checkedMutations = 0;
+
+    window.__browserUse = window.__browserUse || {};
+    window.__browserUse.lastTimings = timings;
+
+    return serialize ? JSON.stringify(result) : result;
 }
\ No newline at end of file
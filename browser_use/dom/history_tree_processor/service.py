@@ -1,10 +1,12 @@
-import hashlib
 from dataclasses import dataclass
 from typing import Optional
 
 from browser_use.dom.history_tree_processor.view import DOMHistoryElement, HashedDomElement
 from browser_use.dom.views import DOMElementNode
 
+# Running branch path hash of a root element, its own tag is not part of the path
+EMPTY_PATH_HASH = 0
+
 
 class HistoryTreeProcessor:
 	""" "
@@ -29,23 +31,8 @@ class HistoryTreeProcessor:
 	def find_history_element_in_tree(
 		dom_history_element: DOMHistoryElement, tree: DOMElementNode
 	) -> Optional[DOMElementNode]:
-		hashed_dom_history_element = HistoryTreeProcessor._hash_dom_history_element(
-			dom_history_element
-		)
-
-		def process_node(node: DOMElementNode):
-			if node.highlight_index is not None:
-				hashed_node = HistoryTreeProcessor._hash_dom_element(node)
-				if hashed_node == hashed_dom_history_element:
-					return node
-			for child in node.children:
-				if isinstance(child, DOMElementNode):
-					result = process_node(child)
-					if result is not None:
-						return result
-			return None
-
-		return process_node(tree)
+		"""One-off lookup, use `DOMState.element_index` to look up several elements in the same state"""
+		return DomElementIndex(tree).find(dom_history_element)
 
 	@staticmethod
 	def compare_history_element_and_dom_element(
@@ -69,8 +56,7 @@ class HistoryTreeProcessor:
 
 	@staticmethod
 	def _hash_dom_element(dom_element: DOMElementNode) -> HashedDomElement:
-		parent_branch_path = HistoryTreeProcessor._get_parent_branch_path(dom_element)
-		branch_path_hash = HistoryTreeProcessor._parent_branch_path_hash(parent_branch_path)
+		branch_path_hash = HistoryTreeProcessor._branch_path_hash(dom_element)
 		attributes_hash = HistoryTreeProcessor._attributes_hash(dom_element.attributes)
 		# text_hash = DomTreeProcessor._text_hash(dom_element)
 
@@ -88,18 +74,115 @@ class HistoryTreeProcessor:
 
 		return [parent.tag_name for parent in parents]
 
+	@staticmethod
+	def running_branch_path_hash(parent: Optional[DOMElementNode], tag_name: str) -> Optional[int]:
+		"""
+		Running hash of an element, from the one of its parent. DomService sets it on every element
+		as it parses the tree, None if the parent's is not known.
+		"""
+		if parent is None:
+			# The root's own tag is not part of the path
+			return EMPTY_PATH_HASH
+		if parent._running_branch_path_hash is None:
+			return None
+		return hash((parent._running_branch_path_hash, tag_name))
+
+	@staticmethod
+	def rehash_branch_paths(tree: DOMElementNode) -> None:
+		"""Recompute the running hashes of a subtree that was attached under a new parent"""
+		stack: list[DOMElementNode] = [tree]
+		while stack:
+			node = stack.pop()
+			node._running_branch_path_hash = HistoryTreeProcessor.running_branch_path_hash(
+				node.parent, node.tag_name
+			)
+			node._hash = None
+			stack.extend(child for child in node.children if isinstance(child, DOMElementNode))
+
+	@staticmethod
+	def _branch_path_hash(dom_element: DOMElementNode) -> str:
+		"""
+		Branch path hash of an element. Parsed trees carry the running hash of every element already,
+		trees built by hand get it here from their closest hashed ancestor.
+		"""
+		running_hash = dom_element._running_branch_path_hash
+		if running_hash is None:
+			# Extend the running hash of the closest hashed ancestor down to this element
+			uncached = [dom_element]
+			ancestor = dom_element.parent
+			while ancestor is not None and ancestor._running_branch_path_hash is None:
+				uncached.append(ancestor)
+				ancestor = ancestor.parent
+			running_hash = (
+				ancestor._running_branch_path_hash if ancestor is not None else EMPTY_PATH_HASH
+			)
+
+			for node in reversed(uncached):
+				# The root's own tag is not part of the path
+				if node.parent is not None:
+					running_hash = hash((running_hash, node.tag_name))
+				node._running_branch_path_hash = running_hash
+
+		return HistoryTreeProcessor._format_hash(running_hash)  # type: ignore
+
 	@staticmethod
 	def _parent_branch_path_hash(parent_branch_path: list[str]) -> str:
-		parent_branch_path_string = '/'.join(parent_branch_path)
-		return hashlib.sha256(parent_branch_path_string.encode()).hexdigest()
+		# Same running hash as _branch_path_hash computes along the tree
+		running_hash = EMPTY_PATH_HASH
+		for tag_name in parent_branch_path:
+			running_hash = hash((running_hash, tag_name))
+		return HistoryTreeProcessor._format_hash(running_hash)
 
 	@staticmethod
 	def _attributes_hash(attributes: dict[str, str]) -> str:
-		attributes_string = ''.join(f'{key}={value}' for key, value in attributes.items())
-		return hashlib.sha256(attributes_string.encode()).hexdigest()
+		return HistoryTreeProcessor._format_hash(hash(tuple(attributes.items())))
 
 	@staticmethod
 	def _text_hash(dom_element: DOMElementNode) -> str:
 		""" """
 		text_string = dom_element.get_all_text_till_next_clickable_element()
-		return hashlib.sha256(text_string.encode()).hexdigest()
+		return HistoryTreeProcessor._format_hash(hash(text_string))
+
+	@staticmethod
+	def _format_hash(value: int) -> str:
+		"""
+		Hashes use Python's builtin hash, a fast non-cryptographic 64 bit hash. It is salted per
+		process, which is fine: hashes only identify elements within a run and are recomputed
+		from the recorded branch paths and attributes when a history is replayed.
+		"""
+		return f'{value & 0xFFFFFFFFFFFFFFFF:016x}'
+
+
+class DomElementIndex:
+	"""
+	Highlighted elements of a tree by their hash, built once and shared by all lookups.
+
+	A secondary index by attributes hash finds elements that only partially match, e.g. ones
+	that moved elsewhere in the page.
+	Elements are kept in document order, the first one wins like in a tree scan.
+	"""
+
+	def __init__(self, tree: DOMElementNode):
+		self.by_hash: dict[HashedDomElement, DOMElementNode] = {}
+		self.by_attributes_hash: dict[str, list[DOMElementNode]] = {}
+
+		stack: list[DOMElementNode] = [tree]
+		while stack:
+			node = stack.pop()
+			if node.highlight_index is not None:
+				hashed_node = node.hash
+				self.by_hash.setdefault(hashed_node, node)
+				self.by_attributes_hash.setdefault(hashed_node.attributes_hash, []).append(node)
+			stack.extend(
+				child for child in reversed(node.children) if isinstance(child, DOMElementNode)
+			)
+
+	def find(self, dom_history_element: DOMHistoryElement) -> Optional[DOMElementNode]:
+		hashed_dom_history_element = HistoryTreeProcessor._hash_dom_history_element(
+			dom_history_element
+		)
+		return self.by_hash.get(hashed_dom_history_element)
+
+	def find_by_attributes(self, dom_history_element: DOMHistoryElement) -> list[DOMElementNode]:
+		attributes_hash = HistoryTreeProcessor._attributes_hash(dom_history_element.attributes)
+		return self.by_attributes_hash.get(attributes_hash, [])
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True)
 class HashedDomElement:
 	"""
 	Hash of the dom element to be used as a unique identifier
@@ -1,58 +1,542 @@
+import asyncio
+import json
 import logging
+import sys
+from functools import cache
 from importlib import resources
-from typing import Optional
+from typing import Any, Optional
 
-from playwright.async_api import Page
+from playwright.async_api import ElementHandle, Frame, Page
 
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
 from browser_use.dom.views import (
 	DOMBaseNode,
 	DOMElementNode,
 	DOMState,
 	DOMTextNode,
+	HighlightBox,
+	PageInfo,
 	SelectorMap,
 )
 
 logger = logging.getLogger(__name__)
 
+# Node flags of the flat wire format (see flattenTree in buildDomTree.js)
+FLAG_VISIBLE = 1
+FLAG_INTERACTIVE = 2
+FLAG_TOP = 4
+FLAG_SHADOW_ROOT = 8
+FLAG_TEXT = 16
+
+# buildDomTree.js is installed once per page under this global, each step only calls it
+EXTRACTOR_NAMESPACE = '__browserUse'
+EXTRACTOR_NOT_INSTALLED = 'BROWSER_USE_EXTRACTOR_NOT_INSTALLED'
+CALL_EXTRACTOR_SCRIPT = f"""(args) => {{
+	const extractor = window.{EXTRACTOR_NAMESPACE}?.buildDomTree;
+	return extractor ? extractor(args) : '{EXTRACTOR_NOT_INSTALLED}';
+}}"""
+
+# Highlights of separately extracted frames are drawn with frame-local indices
+OFFSET_HIGHLIGHTS_SCRIPT = """(offset) => {
+	for (const label of document.querySelectorAll('#playwright-highlight-container .playwright-highlight-label')) {
+		label.textContent = Number(label.textContent) + offset;
+	}
+	for (const element of document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]')) {
+		const index = Number(element.getAttribute('browser-user-highlight-id').slice('playwright-highlight-'.length));
+		element.setAttribute('browser-user-highlight-id', `playwright-highlight-${index + offset}`);
+	}
+}"""
+
+# Top left corner of an iframe's content in screenshot pixels of its parent frame
+IFRAME_ORIGIN_SCRIPT = """(iframe) => {
+	const rect = iframe.getBoundingClientRect();
+	const scale = window.devicePixelRatio || 1;
+	return [(rect.left + iframe.clientLeft) * scale, (rect.top + iframe.clientTop) * scale];
+}"""
+
+
+def decode_json(data: str) -> Any:
+	"""Decode an extractor result sent as a JSON string, with orjson when it is installed"""
+	if orjson is not None:
+		return orjson.loads(data)
+	return json.loads(data)
+
 
 class DomService:
 	def __init__(self, page: Page):
 		self.page = page
 		self.xpath_cache = {}
 
+		# Snapshot kept between calls for incremental extraction
+		self._epoch: Optional[str] = None
+		self._element_tree: Optional[DOMElementNode] = None
+		self._selector_map: SelectorMap = {}
+		self._nodes_by_id: dict[int, DOMElementNode] = {}
+
+		# <iframe> nodes of the last parsed tree by their index in the `frameElements` argument
+		self._frame_slots: dict[int, DOMElementNode] = {}
+
+		# Arguments of the last extraction, change checks have to see the page the same way
+		self._last_args: dict = {}
+
+	@staticmethod
+	@cache
+	def get_install_script() -> str:
+		"""
+		Script that registers buildDomTree.js under a namespaced global.
+		Meant for `add_init_script`, so the source is shipped and compiled once per document.
+		"""
+		js_code = resources.read_text('browser_use.dom', 'buildDomTree.js')
+		# Wrapped so the script evaluates to undefined instead of the extractor function
+		return (
+			f'(() => {{ window.{EXTRACTOR_NAMESPACE} = window.{EXTRACTOR_NAMESPACE} || {{}}; '
+			f'window.{EXTRACTOR_NAMESPACE}.buildDomTree = {js_code}; }})();'
+		)
+
+	async def _run_extractor(self, args: dict, frame: Optional[Frame] = None) -> Any:
+		target = frame or self.page
+		result = await target.evaluate(CALL_EXTRACTOR_SCRIPT, args)
+		if result == EXTRACTOR_NOT_INSTALLED:
+			# Documents that were loaded before the init script was registered
+			logger.debug('DOM extractor not installed in page, installing it now')
+			await target.evaluate(self.get_install_script())
+			result = await target.evaluate(CALL_EXTRACTOR_SCRIPT, args)
+		if args.get('serialize') and isinstance(result, str):
+			result = decode_json(result)
+		return result
+
+	async def has_new_interactive_elements(self) -> bool:
+		"""
+		Whether elements that would be highlighted appeared since the last extraction.
+
+		Answered in the page in one evaluate: a mutation counter skips the check entirely while
+		nothing changed, otherwise the page is walked without serializing or highlighting it.
+		Without a previous extraction in the current document (e.g. after a navigation) the
+		answer is always yes.
+		"""
+		result = await self._run_extractor(
+			{
+				**self._last_args,
+				'doHighlightElements': False,
+				'serialize': False,
+				'fingerprintOnly': True,
+			}
+		)
+		new_elements = result.get('newElements')
+		return new_elements is None or new_elements > 0
+
+	async def get_extraction_timings(self) -> Optional[dict]:
+		"""
+		In-page counters of the last extraction: visited elements, hit tests,
+		highlights and the time spent walking and highlighting in ms.
+		"""
+		return await self.page.evaluate(f'() => window.{EXTRACTOR_NAMESPACE}?.lastTimings ?? null')
+
 	# region - Clickable elements
-	async def get_clickable_elements(self, highlight_elements: bool = True) -> DOMState:
-		element_tree = await self._build_dom_tree(highlight_elements)
+	async def get_clickable_elements(
+		self,
+		highlight_elements: bool = True,
+		incremental: bool = False,
+		flat: bool = False,
+		viewport_expansion: Optional[float] = None,
+		prune_invisible: bool = False,
+		per_frame: bool = False,
+		json_transport: bool = False,
+		highlight_boxes: bool = False,
+		remove_highlights: bool = False,
+		page_info: bool = False,
+	) -> DOMState:
+		"""
+		Extract the interactive elements of the page.
+
+		With `incremental`, the in-page extractor keeps its node table alive between calls and
+		only re-walks the subtrees that changed since the previous call. The changed subtrees are
+		patched into the previous element tree and selector map.
+
+		With `flat`, the page returns the tree as parallel arrays instead of one nested object,
+		which is smaller to serialize and is decoded in a single linear pass.
+
+		With `viewport_expansion`, only elements within that many viewports above and below the
+		current one are extracted. Interactive elements further away are only counted.
+
+		With `prune_invisible`, subtrees that contain nothing visible or highlighted are dropped in
+		the page before serialization. `display: none` subtrees are not walked at all.
+
+		With `per_frame`, every frame of the page, cross-origin iframes included, is extracted
+		concurrently and attached under its <iframe> node. Each frame gets its own block of
+		highlight indices after the ones of its parent frames. Not combined with `incremental`,
+		which keeps walking same-origin iframes inside the page.
+
+		With `json_transport`, the page returns its result as a JSON string that is decoded with
+		orjson (or the standard library). Large results cross the protocol much faster as one
+		string than as an object, which Playwright serializes value by value on both sides.
+
+		With `highlight_boxes`, the boxes of the highlighted elements are returned in
+		`DOMState.highlight_boxes` so they can be drawn onto a screenshot instead of into the page.
+
+		With `remove_highlights` and `page_info`, the same call also removes the highlights of the
+		previous extraction and returns the title and scroll position in `DOMState.page_info`,
+		saving a round trip each.
+		"""
+		args = {
+			'doHighlightElements': highlight_elements,
+			'flat': flat,
+			'viewportExpansion': viewport_expansion,
+			'pruneInvisible': prune_invisible,
+			'serialize': json_transport,
+			'highlightBoxes': highlight_boxes,
+			'removeHighlights': remove_highlights,
+			'pageInfo': page_info,
+		}
+		# Frames extracted separately are not part of the main frame's baseline
+		self._last_args = {**args, 'frameElements': []} if per_frame else args
+		if incremental:
+			return await self._get_incremental_snapshot(args)
+
+		if per_frame:
+			element_tree, result, boxes = await self._build_frame_trees(args)
+		else:
+			element_tree, result, boxes = await self._build_dom_tree(args)
 		selector_map = self._create_selector_map(element_tree)
 
-		return DOMState(element_tree=element_tree, selector_map=selector_map)
+		offscreen = result.get('offscreen') or {}
+		return DOMState(
+			element_tree=element_tree,
+			selector_map=selector_map,
+			offscreen_above=offscreen.get('above', 0),
+			offscreen_below=offscreen.get('below', 0),
+			highlight_boxes=boxes,
+			page_info=self._parse_page_info(result.get('page')),
+		)
 
-	async def _build_dom_tree(self, highlight_elements: bool) -> DOMElementNode:
-		js_code = resources.read_text('browser_use.dom', 'buildDomTree.js')
+	async def _get_incremental_snapshot(self, args: dict) -> DOMState:
+		snapshot = await self._run_extractor(
+			{
+				**args,
+				'incremental': True,
+				'epoch': self._epoch if self._element_tree is not None else None,
+			},
+		)
+
+		if snapshot['mode'] == 'full':
+			self._nodes_by_id = {}
+			element_tree = self._parse_tree(snapshot['tree'])
+			if element_tree is None or not isinstance(element_tree, DOMElementNode):
+				raise ValueError('Failed to parse HTML to dictionary')
+			self._element_tree = element_tree
+			self._selector_map = self._create_selector_map(element_tree)
+		elif snapshot['mode'] == 'patch':
+			# Copy so that selector maps handed out earlier keep pointing at their own nodes
+			self._selector_map = dict(self._selector_map)
+			for patch in snapshot['patches']:
+				self._apply_patch(patch['id'], patch['node'])
+
+		self._epoch = snapshot['epoch']
+		assert self._element_tree is not None
+		offscreen = snapshot.get('offscreen') or {}
+		return DOMState(
+			element_tree=self._element_tree,
+			selector_map=self._selector_map,
+			offscreen_above=offscreen.get('above', 0),
+			offscreen_below=offscreen.get('below', 0),
+			highlight_boxes=self._parse_highlight_boxes(snapshot.get('highlightBoxes')),
+			page_info=self._parse_page_info(snapshot.get('page')),
+		)
+
+	def _apply_patch(self, node_id: int, node_data: dict) -> None:
+		old_node = self._nodes_by_id.get(node_id)
+		if old_node is None:
+			# Already replaced together with an enclosing patch
+			return
+
+		self._forget_subtree(old_node)
+		new_node = self._parse_tree(node_data, parent=old_node.parent)
+		if not isinstance(new_node, DOMElementNode):
+			raise ValueError(f'Failed to parse patch for node {node_id}')
+
+		if old_node.parent is None:
+			self._element_tree = new_node
+		else:
+			siblings = old_node.parent.children
+			siblings[next(i for i, child in enumerate(siblings) if child is old_node)] = new_node
 
-		eval_page = await self.page.evaluate(
-			js_code, [highlight_elements]
-		)  # This is quite big, so be careful
-		html_to_dict = self._parse_node(eval_page)
+		self._selector_map.update(self._create_selector_map(new_node))
+
+	def _forget_subtree(self, node: DOMElementNode) -> None:
+		stack: list[DOMBaseNode] = [node]
+		while stack:
+			current = stack.pop()
+			if isinstance(current, DOMElementNode):
+				if current.node_id is not None:
+					self._nodes_by_id.pop(current.node_id, None)
+				if current.highlight_index is not None:
+					self._selector_map.pop(current.highlight_index, None)
+				stack.extend(current.children)
+
+	async def _build_dom_tree(self, args: dict) -> tuple[DOMElementNode, dict, list[HighlightBox]]:
+		"""Returns the tree, the raw extractor result for the page level fields and the highlight boxes"""
+		eval_page = await self._run_extractor(args)  # This is quite big, so be careful
+		html_to_dict = self._parse_tree(eval_page)
 
 		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
 			raise ValueError('Failed to parse HTML to dictionary')
 
-		return html_to_dict
+		boxes = self._parse_highlight_boxes(eval_page.get('highlightBoxes'))
+		return html_to_dict, eval_page, boxes
+
+	def _parse_highlight_boxes(
+		self,
+		data: Optional[list[float]],
+		index_offset: int = 0,
+		origin: tuple[float, float] = (0, 0),
+	) -> list[HighlightBox]:
+		"""Boxes arrive as a flat [index, left, top, width, height, ...] list"""
+		if not data:
+			return []
+		origin_left, origin_top = origin
+		return [
+			HighlightBox(
+				highlight_index=int(data[i]) + index_offset,
+				left=data[i + 1] + origin_left,
+				top=data[i + 2] + origin_top,
+				width=data[i + 3],
+				height=data[i + 4],
+			)
+			for i in range(0, len(data), 5)
+		]
+
+	def _parse_page_info(self, data: Optional[dict]) -> Optional[PageInfo]:
+		if not data:
+			return None
+		scroll_y = data.get('scrollY') or 0
+		pixels_below = (
+			(data.get('scrollHeight') or 0) - scroll_y - (data.get('viewportHeight') or 0)
+		)
+		return PageInfo(
+			url=data.get('url') or '',
+			title=data.get('title') or '',
+			pixels_above=int(scroll_y),
+			pixels_below=max(int(pixels_below), 0),
+		)
+
+	async def _build_frame_trees(
+		self, args: dict
+	) -> tuple[DOMElementNode, dict, list[HighlightBox]]:
+		main_frame = self.page.main_frame
+		child_frames = [
+			frame
+			for frame in self.page.frames
+			if frame is not main_frame and not frame.is_detached()
+		]
+		frame_elements = await asyncio.gather(
+			*(frame.frame_element() for frame in child_frames), return_exceptions=True
+		)
+
+		handles = [handle for handle in frame_elements if not isinstance(handle, BaseException)]
+		try:
+			# Each frame is found again in its parent through its position in the parent's `frameElements`
+			iframes: dict[Frame, list[ElementHandle]] = {}
+			positions: dict[Frame, int] = {}
+			for frame, frame_element in zip(child_frames, frame_elements):
+				if isinstance(frame_element, BaseException) or frame.parent_frame is None:
+					logger.debug(f'Skipping frame {frame.url}: {frame_element}')
+					continue
+				siblings = iframes.setdefault(frame.parent_frame, [])
+				positions[frame] = len(siblings)
+				siblings.append(frame_element)
+
+			# page.frames lists parent frames before their children
+			frames = [main_frame] + [frame for frame in child_frames if frame in positions]
+			results = await asyncio.gather(
+				*(
+					self._run_extractor(
+						{**args, 'frameElements': iframes.get(frame, [])}, frame=frame
+					)
+					for frame in frames
+				),
+				return_exceptions=True,
+			)
+			if isinstance(results[0], BaseException):
+				raise results[0]
+
+			# Boxes of a frame are relative to its own viewport
+			iframe_origins: dict[Frame, Any] = {}
+			if args.get('highlightBoxes'):
+				origins = await asyncio.gather(
+					*(
+						iframes[frame.parent_frame][positions[frame]].evaluate(IFRAME_ORIGIN_SCRIPT)  # type: ignore
+						for frame in frames[1:]
+					),
+					return_exceptions=True,
+				)
+				iframe_origins = dict(zip(frames[1:], origins))
+		finally:
+			# Remote handles would otherwise live until the next navigation
+			await asyncio.gather(*(handle.dispose() for handle in handles), return_exceptions=True)
+
+		trees: dict[Frame, DOMElementNode] = {}
+		slots: dict[Frame, dict[int, DOMElementNode]] = {}
+		for frame, result in zip(frames, results):
+			if isinstance(result, BaseException):
+				logger.debug(f'Failed to extract frame {frame.url}: {result}')
+				continue
+			self._frame_slots = {}
+			tree = self._parse_tree(result)
+			if isinstance(tree, DOMElementNode):
+				trees[frame] = tree
+				slots[frame] = self._frame_slots
+		self._frame_slots = {}
+
+		if main_frame not in trees:
+			raise ValueError('Failed to parse HTML to dictionary')
+
+		# Every tree is shifted before the frames inside it are attached
+		next_index = 0
+		offsets: dict[Frame, int] = {}
+		frame_origins: dict[Frame, tuple[float, float]] = {main_frame: (0, 0)}
+		boxes: list[HighlightBox] = []
+		for frame, result in zip(frames, results):
+			tree = trees.get(frame)
+			if tree is None:
+				continue
+			if frame is not main_frame:
+				# The <iframe> node is missing when it was pruned, out of the viewport range
+				# or its own frame failed
+				slot = slots.get(frame.parent_frame, {}).get(positions[frame])  # type: ignore
+				if slot is None:
+					continue
+				tree.parent = slot
+				slot.children.append(tree)
+				# Hashed as a root while parsed on its own
+				HistoryTreeProcessor.rehash_branch_paths(tree)
+
+			if args.get('highlightBoxes'):
+				if frame is not main_frame:
+					parent_origin = frame_origins.get(frame.parent_frame, (0, 0))  # type: ignore
+					iframe_origin = iframe_origins.get(frame)
+					if isinstance(iframe_origin, BaseException) or iframe_origin is None:
+						iframe_origin = (0, 0)
+					frame_origins[frame] = (
+						parent_origin[0] + iframe_origin[0],
+						parent_origin[1] + iframe_origin[1],
+					)
+				boxes.extend(
+					self._parse_highlight_boxes(
+						result.get('highlightBoxes'), next_index, frame_origins[frame]
+					)  # type: ignore
+				)
+
+			offsets[frame] = next_index
+			next_index += self._offset_highlight_indices(tree, next_index)
+
+		if args['doHighlightElements']:
+			await asyncio.gather(
+				*(
+					frame.evaluate(OFFSET_HIGHLIGHTS_SCRIPT, offset)
+					for frame, offset in offsets.items()
+					if offset > 0
+				),
+				return_exceptions=True,
+			)
+
+		return trees[main_frame], results[0], boxes
+
+	def _offset_highlight_indices(self, element_tree: DOMElementNode, offset: int) -> int:
+		"""Shift the frame-local highlight indices of a tree, returns how many indices it uses"""
+		used = 0
+		stack: list[DOMBaseNode] = [element_tree]
+		while stack:
+			node = stack.pop()
+			if isinstance(node, DOMElementNode):
+				if node.highlight_index is not None:
+					used = max(used, node.highlight_index + 1)
+					node.highlight_index += offset
+				stack.extend(node.children)
+		return used
 
 	def _create_selector_map(self, element_tree: DOMElementNode) -> SelectorMap:
 		selector_map = {}
-
-		def process_node(node: DOMBaseNode):
+		stack: list[DOMBaseNode] = [element_tree]
+		while stack:
+			node = stack.pop()
 			if isinstance(node, DOMElementNode):
 				if node.highlight_index is not None:
 					selector_map[node.highlight_index] = node
+				# Document order, a later duplicate index wins like before
+				stack.extend(reversed(node.children))
+		return selector_map
 
-				for child in node.children:
-					process_node(child)
+	def _parse_tree(
+		self, data: Optional[dict], parent: Optional[DOMElementNode] = None
+	) -> Optional[DOMBaseNode]:
+		if data and data.get('format') == 'flat':
+			return self._decode_flat_tree(data, parent=parent)
+		return self._parse_node(data, parent=parent)  # type: ignore
 
-		process_node(element_tree)
-		return selector_map
+	def _decode_flat_tree(
+		self, data: dict, parent: Optional[DOMElementNode] = None
+	) -> Optional[DOMBaseNode]:
+		"""Decode the flat wire format in one pass, nodes arrive in document order"""
+		strings: list[str] = data['strings']
+		parents: list[int] = data['parent']
+		names: list[int] = data['name']
+		xpaths: list[int] = data['xpath']
+		flags: list[int] = data['flags']
+		highlights: list[int] = data['highlight']
+		ids: list[int] = data['id']
+		frames: list[int] = data['frame']
+		attr_offsets: list[int] = data['attrOffsets']
+		attrs: list[int] = data['attrs']
+		running_branch_path_hash = HistoryTreeProcessor.running_branch_path_hash
+
+		nodes: list[DOMBaseNode] = []
+		for i, parent_index in enumerate(parents):
+			node_parent = nodes[parent_index] if parent_index >= 0 else parent
+			assert node_parent is None or isinstance(node_parent, DOMElementNode)
+			node_flags = flags[i]
+
+			node: DOMBaseNode
+			if node_flags & FLAG_TEXT:
+				node = DOMTextNode(
+					text=strings[names[i]],
+					is_visible=bool(node_flags & FLAG_VISIBLE),
+					parent=node_parent,
+				)
+			else:
+				node = DOMElementNode(
+					tag_name=strings[names[i]],
+					xpath=strings[xpaths[i]],
+					attributes={
+						strings[attrs[j]]: strings[attrs[j + 1]]
+						for j in range(2 * attr_offsets[i], 2 * attr_offsets[i + 1], 2)
+					},
+					children=[],
+					is_visible=bool(node_flags & FLAG_VISIBLE),
+					is_interactive=bool(node_flags & FLAG_INTERACTIVE),
+					is_top_element=bool(node_flags & FLAG_TOP),
+					highlight_index=highlights[i] if highlights[i] >= 0 else None,
+					shadow_root=bool(node_flags & FLAG_SHADOW_ROOT),
+					parent=node_parent,
+					node_id=ids[i] if ids[i] >= 0 else None,
+				)
+				node._running_branch_path_hash = running_branch_path_hash(
+					node_parent, node.tag_name
+				)
+				if node.node_id is not None:
+					self._nodes_by_id[node.node_id] = node
+				if frames[i] >= 0:
+					self._frame_slots[frames[i]] = node
+
+			if parent_index >= 0 and node_parent is not None:
+				node_parent.children.append(node)
+			nodes.append(node)
+
+		return nodes[0] if nodes else None
 
 	def _parse_node(
 		self,
@@ -71,7 +555,8 @@ class DomService:
 
 			return text_node
 
-		tag_name = node_data['tagName']
+		# Tag names repeat on every page, share one string object per name
+		tag_name = sys.intern(node_data['tagName'])
 
 		element_node = DOMElementNode(
 			tag_name=tag_name,
@@ -84,7 +569,16 @@ class DomService:
 			highlight_index=node_data.get('highlightIndex'),
 			shadow_root=node_data.get('shadowRoot', False),
 			parent=parent,
+			node_id=node_data.get('id'),
+		)
+		# Hashed top-down as the tree is parsed, the parent is complete by now
+		element_node._running_branch_path_hash = HistoryTreeProcessor.running_branch_path_hash(
+			parent, tag_name
 		)
+		if element_node.node_id is not None:
+			self._nodes_by_id[element_node.node_id] = element_node
+		if node_data.get('frameIndex') is not None:
+			self._frame_slots[node_data['frameIndex']] = element_node
 
 		children: list[DOMBaseNode] = []
 		for child in node_data.get('children', []):
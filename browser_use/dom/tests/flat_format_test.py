@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from browser_use.dom import service
+from browser_use.dom.service import FLAG_INTERACTIVE, FLAG_TEXT, FLAG_TOP, FLAG_VISIBLE, DomService
+from browser_use.dom.views import DOMElementNode, DOMTextNode
+
+NESTED_TREE = {
+	'tagName': 'body',
+	'xpath': 'body',
+	'attributes': {},
+	'isVisible': True,
+	'children': [
+		{
+			'tagName': 'a',
+			'xpath': 'body/a',
+			'attributes': {'href': '/home', 'class': 'nav'},
+			'isVisible': True,
+			'isInteractive': True,
+			'isTopElement': True,
+			'highlightIndex': 0,
+			'children': [{'type': 'TEXT_NODE', 'text': 'Home', 'isVisible': True}],
+		},
+		{'type': 'TEXT_NODE', 'text': 'Footer', 'isVisible': True},
+	],
+}
+
+# Same tree as flattenTree in buildDomTree.js encodes it
+FLAT_TREE = {
+	'format': 'flat',
+	'strings': ['body', 'a', 'body/a', 'href', '/home', 'class', 'nav', 'Home', 'Footer'],
+	'parent': [-1, 0, 1, 0],
+	'name': [0, 1, 7, 8],
+	'xpath': [0, 2, -1, -1],
+	'flags': [
+		FLAG_VISIBLE,
+		FLAG_VISIBLE | FLAG_INTERACTIVE | FLAG_TOP,
+		FLAG_TEXT | FLAG_VISIBLE,
+		FLAG_TEXT | FLAG_VISIBLE,
+	],
+	'highlight': [-1, 0, -1, -1],
+	'id': [-1, -1, -1, -1],
+	'frame': [-1, -1, -1, -1],
+	'attrOffsets': [0, 0, 2, 2, 2],
+	'attrs': [3, 4, 5, 6],
+}
+
+
+def test_flat_format_decodes_like_nested_format():
+	dom_service = DomService(None)  # type: ignore
+
+	nested = dom_service._parse_tree(NESTED_TREE)
+	flat = dom_service._parse_tree(FLAT_TREE)
+
+	assert isinstance(nested, DOMElementNode)
+	assert isinstance(flat, DOMElementNode)
+	assert repr(flat) == repr(nested)
+	assert flat.clickable_elements_to_string() == nested.clickable_elements_to_string()
+
+	link = flat.children[0]
+	assert isinstance(link, DOMElementNode)
+	assert link.parent is flat
+	assert link.attributes == {'href': '/home', 'class': 'nav'}
+	assert link.highlight_index == 0
+	assert isinstance(link.children[0], DOMTextNode)
+	assert link.children[0].parent is link
+	assert dom_service._create_selector_map(flat) == {0: link}
+
+
+def test_deep_flat_tree_needs_no_recursion():
+	depth = 3000
+	deep_tree = {
+		'format': 'flat',
+		'strings': ['div', 'div/'],
+		'parent': list(range(-1, depth - 1)),
+		'name': [0] * depth,
+		'xpath': [1] * depth,
+		'flags': [FLAG_VISIBLE] * (depth - 1) + [FLAG_VISIBLE | FLAG_INTERACTIVE | FLAG_TOP],
+		'highlight': [-1] * (depth - 1) + [0],
+		'id': [-1] * depth,
+		'frame': [-1] * depth,
+		'attrOffsets': [0] * (depth + 1),
+		'attrs': [],
+	}
+	dom_service = DomService(None)  # type: ignore
+
+	tree = dom_service._parse_tree(deep_tree)
+	assert isinstance(tree, DOMElementNode)
+	selector_map = dom_service._create_selector_map(tree)
+	assert list(selector_map) == [0] and selector_map[0].highlight_index == 0
+
+
+class JsonPage:
+	"""Returns the extractor result as JSON.stringify would"""
+
+	async def evaluate(self, js_code: str, args: dict):
+		assert args['serialize']
+		return json.dumps(NESTED_TREE)
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+async def test_json_transport_decodes_like_object_transport(monkeypatch, use_orjson):
+	if not use_orjson:
+		monkeypatch.setattr(service, 'orjson', None)
+	dom_service = DomService(JsonPage())  # type: ignore
+
+	state = await dom_service.get_clickable_elements(json_transport=True)
+
+	expected = DomService(None)._parse_tree(NESTED_TREE)  # type: ignore
+	assert repr(state.element_tree) == repr(expected)
+	assert sorted(state.selector_map) == [0]
@@ -0,0 +1,176 @@
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode
+
+
+class FakeIframe:
+	"""Handle of an <iframe> element, placed at `origin` in its parent frame"""
+
+	def __init__(self, url: str, origin: list[float]):
+		self.url = url
+		self.origin = origin
+		self.disposed = False
+
+	async def evaluate(self, js_code: str):
+		return self.origin
+
+	async def dispose(self):
+		self.disposed = True
+
+
+class FakeFrame:
+	"""Returns a canned extractor result and records the iframe handles it was given"""
+
+	def __init__(
+		self,
+		url: str,
+		tree: dict,
+		parent_frame: 'FakeFrame | None' = None,
+		origin: list[float] = [0, 0],
+	):
+		self.url = url
+		self.tree = tree
+		self.parent_frame = parent_frame
+		self.origin = origin
+		self.frame_elements: list | None = None
+
+	def is_detached(self) -> bool:
+		return False
+
+	async def frame_element(self):
+		return FakeIframe(self.url, self.origin)
+
+	async def evaluate(self, js_code: str, args=None):
+		if isinstance(args, dict):
+			self.frame_elements = args['frameElements']
+			return self.tree
+
+
+class FakePage:
+	def __init__(self, frames: list[FakeFrame]):
+		self.main_frame = frames[0]
+		self.frames = frames
+
+
+def element(tag_name: str, children: list, highlight_index: int | None = None, **extra) -> dict:
+	return {
+		'tagName': tag_name,
+		'xpath': tag_name,
+		'attributes': {},
+		'isVisible': True,
+		'isInteractive': highlight_index is not None,
+		'isTopElement': True,
+		'highlightIndex': highlight_index,
+		'children': children,
+		**extra,
+	}
+
+
+async def test_frames_are_attached_under_their_iframes():
+	main = FakeFrame(
+		'main',
+		element(
+			'body',
+			[
+				element('button', [], highlight_index=0),
+				element('iframe', [], frameIndex=0),
+				element('a', [], highlight_index=1),
+			],
+		),
+	)
+	checkout = FakeFrame(
+		'checkout',
+		element(
+			'body', [element('input', [], highlight_index=0), element('iframe', [], frameIndex=0)]
+		),
+		parent_frame=main,
+	)
+	card = FakeFrame(
+		'card', element('body', [element('input', [], highlight_index=0)]), parent_frame=checkout
+	)
+	dom_service = DomService(FakePage([main, checkout, card]))  # type: ignore
+
+	state = await dom_service.get_clickable_elements(highlight_elements=False, per_frame=True)
+
+	assert [iframe.url for iframe in main.frame_elements] == ['checkout']  # type: ignore
+	assert [iframe.url for iframe in checkout.frame_elements] == ['card']  # type: ignore
+	assert card.frame_elements == []
+	# The handles are released once the frames are extracted
+	assert all(iframe.disposed for iframe in main.frame_elements + checkout.frame_elements)  # type: ignore
+
+	# Every frame gets its own block of indices after the ones of its parent frame
+	assert sorted(state.selector_map) == [0, 1, 2, 3]
+	iframe = state.element_tree.children[1]
+	assert isinstance(iframe, DOMElementNode)
+	assert state.selector_map[2].parent is iframe.children[0]
+	assert iframe.children[0].parent is iframe
+
+	nested_iframe = iframe.children[0].children[1]
+	assert isinstance(nested_iframe, DOMElementNode)
+	assert state.selector_map[3].parent is nested_iframe.children[0]
+
+	# Branch paths hashed while parsing a frame on its own are redone under its <iframe>
+	card_input = state.selector_map[3]
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(card_input)
+	assert card_input.hash == HistoryTreeProcessor._hash_dom_history_element(history_element)
+
+
+async def test_failed_frame_is_left_out():
+	main = FakeFrame('main', element('body', [element('iframe', [], frameIndex=0)]))
+	broken = FakeFrame('broken', None, parent_frame=main)  # type: ignore
+
+	async def fail(js_code: str, args=None):
+		raise RuntimeError('Frame was detached')
+
+	broken.evaluate = fail  # type: ignore
+	dom_service = DomService(FakePage([main, broken]))  # type: ignore
+
+	state = await dom_service.get_clickable_elements(highlight_elements=False, per_frame=True)
+
+	assert state.selector_map == {}
+	assert state.element_tree.children[0].children == []  # type: ignore
+
+
+async def test_highlight_boxes_are_moved_into_the_page_viewport():
+	main = FakeFrame(
+		'main',
+		{
+			**element(
+				'body',
+				[element('button', [], highlight_index=0), element('iframe', [], frameIndex=0)],
+			),
+			'highlightBoxes': [0, 5, 5, 20, 10],
+		},
+	)
+	checkout = FakeFrame(
+		'checkout',
+		{
+			**element(
+				'body',
+				[element('input', [], highlight_index=0), element('iframe', [], frameIndex=0)],
+			),
+			'highlightBoxes': [0, 1, 2, 30, 10],
+		},
+		parent_frame=main,
+		origin=[100, 200],
+	)
+	card = FakeFrame(
+		'card',
+		{
+			**element('body', [element('input', [], highlight_index=0)]),
+			'highlightBoxes': [0, 3, 4, 40, 10],
+		},
+		parent_frame=checkout,
+		origin=[10, 20],
+	)
+	dom_service = DomService(FakePage([main, checkout, card]))  # type: ignore
+
+	state = await dom_service.get_clickable_elements(
+		highlight_elements=False, per_frame=True, highlight_boxes=True
+	)
+
+	assert [(box.highlight_index, box.left, box.top) for box in state.highlight_boxes] == [
+		(0, 5, 5),
+		(1, 101, 202),
+		(2, 113, 224),
+	]
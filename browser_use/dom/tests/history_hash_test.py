@@ -0,0 +1,112 @@
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.views import DOMElementNode, DOMState
+
+
+def element(
+	tag_name: str, children: list, highlight_index: int | None = None, **attributes
+) -> DOMElementNode:
+	node = DOMElementNode(
+		tag_name=tag_name,
+		xpath=tag_name,
+		attributes=attributes,
+		children=children,
+		is_visible=True,
+		parent=None,
+		highlight_index=highlight_index,
+	)
+	for child in children:
+		child.parent = node
+	return node
+
+
+def build_tree() -> DOMElementNode:
+	return element(
+		'body',
+		[
+			element('nav', [element('a', [], highlight_index=0, href='/home')]),
+			element('main', [element('div', [element('a', [], highlight_index=1, href='/home')])]),
+		],
+	)
+
+
+def test_element_hash_matches_hash_of_its_history_element():
+	tree = build_tree()
+	for link in (tree.children[0].children[0], tree.children[1].children[0].children[0]):  # type: ignore
+		assert isinstance(link, DOMElementNode)
+		history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(link)
+
+		assert link.hash == HistoryTreeProcessor._hash_dom_history_element(history_element)
+		assert (
+			HistoryTreeProcessor.find_history_element_in_tree(history_element, build_tree())
+			is not None
+		)
+
+
+def test_branch_path_hashes_are_cached_top_down():
+	tree = build_tree()
+	nav_link, main_link = tree.children[0].children[0], tree.children[1].children[0].children[0]  # type: ignore
+	assert isinstance(nav_link, DOMElementNode) and isinstance(main_link, DOMElementNode)
+
+	# Same attributes, different branch
+	assert nav_link.hash.attributes_hash == main_link.hash.attributes_hash
+	assert nav_link.hash.branch_path_hash != main_link.hash.branch_path_hash
+
+	# Ancestors were hashed on the way down and are reused
+	assert main_link.parent is not None
+	assert main_link.parent._running_branch_path_hash is not None
+	assert tree.hash.branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash([])
+
+
+def test_parsed_trees_are_hashed_while_parsing():
+	from browser_use.dom.service import DomService
+
+	data = {
+		'tagName': 'body',
+		'xpath': 'body',
+		'attributes': {},
+		'children': [
+			{
+				'tagName': 'nav',
+				'xpath': 'body/nav',
+				'attributes': {},
+				'children': [
+					{
+						'tagName': 'a',
+						'xpath': 'body/nav/a',
+						'attributes': {'href': '/home'},
+						'highlightIndex': 0,
+					}
+				],
+			}
+		],
+	}
+	tree = DomService(None)._parse_tree(data)  # type: ignore
+	assert isinstance(tree, DOMElementNode)
+	link = tree.children[0].children[0]  # type: ignore
+	assert isinstance(link, DOMElementNode)
+
+	assert link._running_branch_path_hash is not None
+	assert link.hash.branch_path_hash == HistoryTreeProcessor._parent_branch_path_hash(['nav', 'a'])
+
+
+def test_element_index_finds_exact_and_partial_matches():
+	recorded = build_tree()
+	nav_link = recorded.children[0].children[0]  # type: ignore
+	assert isinstance(nav_link, DOMElementNode)
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(nav_link)
+
+	# The link moved out of the <nav> and got a new index
+	tree = element(
+		'body',
+		[
+			element('header', [element('a', [], highlight_index=5, href='/home')]),
+			element('main', [element('div', [element('a', [], highlight_index=6, href='/home')])]),
+		],
+	)
+	state = DOMState(element_tree=tree, selector_map={})
+	index = state.element_index
+
+	assert index.find(history_element) is None
+	assert [node.highlight_index for node in index.find_by_attributes(history_element)] == [5, 6]
+	# Built once per state
+	assert state.element_index is index
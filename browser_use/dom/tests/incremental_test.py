@@ -0,0 +1,165 @@
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode
+
+
+class FakePage:
+	"""Returns canned extractor snapshots in order"""
+
+	def __init__(self, snapshots: list[dict]):
+		self.snapshots = snapshots
+		self.calls: list[dict] = []
+
+	async def evaluate(self, js_code: str, args: dict):
+		self.calls.append(args)
+		return self.snapshots.pop(0)
+
+
+def element(
+	node_id: int, tag_name: str, children: list, highlight_index: int | None = None
+) -> dict:
+	return {
+		'id': node_id,
+		'tagName': tag_name,
+		'xpath': tag_name,
+		'attributes': {},
+		'isVisible': True,
+		'isInteractive': highlight_index is not None,
+		'isTopElement': True,
+		'highlightIndex': highlight_index,
+		'children': children,
+	}
+
+
+def text(value: str) -> dict:
+	return {'type': 'TEXT_NODE', 'text': value, 'isVisible': True}
+
+
+FULL_SNAPSHOT = {
+	'mode': 'full',
+	'epoch': 'epoch-1',
+	'tree': element(
+		0,
+		'body',
+		[
+			element(1, 'button', [text('Open')], highlight_index=0),
+			element(2, 'div', [element(3, 'a', [text('Old link')], highlight_index=1)]),
+		],
+	),
+}
+
+
+async def test_patch_replaces_dirty_subtree():
+	page = FakePage(
+		[
+			FULL_SNAPSHOT,
+			{
+				'mode': 'patch',
+				'epoch': 'epoch-1',
+				'patches': [
+					{
+						'id': 2,
+						'node': element(
+							2,
+							'div',
+							[
+								element(4, 'a', [text('New link')], highlight_index=2),
+								element(5, 'input', [], highlight_index=3),
+							],
+						),
+					}
+				],
+			},
+		]
+	)
+	dom_service = DomService(page)  # type: ignore
+
+	first = await dom_service.get_clickable_elements(incremental=True)
+	first_button = first.selector_map[0]
+	assert sorted(first.selector_map) == [0, 1]
+	assert page.calls[0]['epoch'] is None
+
+	second = await dom_service.get_clickable_elements(incremental=True)
+	assert page.calls[1]['epoch'] == 'epoch-1'
+
+	# Untouched nodes are reused, the dirty subtree is swapped in place
+	assert second.element_tree is first.element_tree
+	assert second.selector_map[0] is first_button
+	assert sorted(second.selector_map) == [0, 2, 3]
+	assert 'New link' in second.element_tree.clickable_elements_to_string()
+	assert 'Old link' not in second.element_tree.clickable_elements_to_string()
+
+	patched = second.element_tree.children[1]
+	assert isinstance(patched, DOMElementNode)
+	assert patched.parent is second.element_tree
+	assert second.selector_map[2].parent is patched
+
+	# Selector maps handed out earlier are left alone
+	assert sorted(first.selector_map) == [0, 1]
+
+
+async def test_unchanged_snapshot_reuses_state():
+	page = FakePage([FULL_SNAPSHOT, {'mode': 'unchanged', 'epoch': 'epoch-1'}])
+	dom_service = DomService(page)  # type: ignore
+
+	first = await dom_service.get_clickable_elements(incremental=True)
+	second = await dom_service.get_clickable_elements(incremental=True)
+
+	assert second.element_tree is first.element_tree
+	assert second.selector_map == first.selector_map
+
+
+async def test_offscreen_counts_are_reported():
+	page = FakePage([{**FULL_SNAPSHOT['tree'], 'offscreen': {'above': 2, 'below': 7}}])
+	dom_service = DomService(page)  # type: ignore
+
+	state = await dom_service.get_clickable_elements(viewport_expansion=1)
+
+	assert page.calls[0]['viewportExpansion'] == 1
+	assert (state.offscreen_above, state.offscreen_below) == (2, 7)
+
+
+async def test_page_info_comes_with_the_snapshot():
+	page_info = {
+		'url': 'https://example.com/',
+		'title': 'Example',
+		'scrollY': 300,
+		'scrollHeight': 2000,
+		'viewportHeight': 1000,
+	}
+	page = FakePage(
+		[
+			{**FULL_SNAPSHOT, 'page': page_info},
+			{'mode': 'unchanged', 'epoch': 'epoch-1', 'page': page_info},
+		]
+	)
+	dom_service = DomService(page)  # type: ignore
+
+	first = await dom_service.get_clickable_elements(
+		incremental=True, remove_highlights=True, page_info=True
+	)
+	second = await dom_service.get_clickable_elements(
+		incremental=True, remove_highlights=True, page_info=True
+	)
+
+	assert page.calls[0]['removeHighlights'] is True
+	for state in (first, second):
+		assert state.page_info is not None
+		assert state.page_info.title == 'Example'
+		assert (state.page_info.pixels_above, state.page_info.pixels_below) == (300, 700)
+
+
+async def test_change_check_sees_the_page_like_the_last_extraction():
+	page = FakePage(
+		[FULL_SNAPSHOT['tree'], {'newElements': 0}, {'newElements': 2}, {'newElements': None}]
+	)
+	dom_service = DomService(page)  # type: ignore
+
+	await dom_service.get_clickable_elements(viewport_expansion=0.5)
+
+	assert await dom_service.has_new_interactive_elements() is False
+	assert page.calls[1]['fingerprintOnly'] is True
+	assert page.calls[1]['viewportExpansion'] == 0.5
+	assert page.calls[1]['doHighlightElements'] is False
+	assert await dom_service.has_new_interactive_elements() is True
+	# No baseline in the page, e.g. after a navigation
+	assert await dom_service.has_new_interactive_elements() is True
@@ -0,0 +1,69 @@
+from browser_use.dom.views import DOMElementNode, DOMTextNode
+
+
+def element(
+	tag_name: str, children: list, highlight_index: int | None = None, **attributes
+) -> DOMElementNode:
+	node = DOMElementNode(
+		tag_name=tag_name,
+		xpath=tag_name,
+		attributes=attributes,
+		children=children,
+		is_visible=True,
+		parent=None,
+		highlight_index=highlight_index,
+	)
+	for child in children:
+		child.parent = node
+	return node
+
+
+def text(value: str) -> DOMTextNode:
+	return DOMTextNode(text=value, is_visible=True, parent=None)
+
+
+def test_clickable_elements_to_string():
+	tree = element(
+		'body',
+		[
+			text('Welcome'),
+			element(
+				'form',
+				[
+					text('Sign in'),
+					element('input', [], highlight_index=1, name='email', type='email'),
+					element('span', [text('or')]),
+					element('a', [text('Register')], highlight_index=2, href='/register'),
+				],
+				highlight_index=0,
+			),
+			element('p', [text('Footer')]),
+		],
+	)
+
+	assert tree.clickable_elements_to_string(include_attributes=['name', 'href']) == '\n'.join(
+		[
+			'_[:]Welcome',
+			'0[:]<form >Sign in\nor</form>',
+			'1[:]<input name="email"></input>',
+			'2[:]<a href="/register">Register</a>',
+			'_[:]Footer',
+		]
+	)
+	# Text below a highlighted ancestor outside of the serialized subtree is left out
+	span = tree.children[1].children[2]  # type: ignore
+	assert isinstance(span, DOMElementNode)
+	assert span.clickable_elements_to_string() == ''
+
+
+def test_deeply_nested_tree_does_not_recurse():
+	leaf = element('button', [text('Deep')], highlight_index=0)
+	node = leaf
+	for _ in range(5_000):
+		node = element('div', [node, text('level')])
+
+	output = node.clickable_elements_to_string()
+
+	assert output.startswith('0[:]<button>Deep</button>\n_[:]level')
+	assert output.count('_[:]level') == 5_000
+	assert node.get_all_text_till_next_clickable_element().endswith('level')
@@ -1,22 +1,24 @@
-from dataclasses import dataclass
-from functools import cached_property
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Dict, List, Optional
 
 from browser_use.dom.history_tree_processor.view import HashedDomElement
 
 # Avoid circular import issues
 if TYPE_CHECKING:
+	from browser_use.dom.history_tree_processor.service import DomElementIndex
+
 	from .views import DOMElementNode
 
 
-@dataclass(frozen=False)
+# Nodes use slots: large pages create hundreds of thousands of them
+@dataclass(frozen=False, slots=True)
 class DOMBaseNode:
 	is_visible: bool
 	# Use None as default and set parent later to avoid circular reference issues
 	parent: Optional['DOMElementNode']
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMTextNode(DOMBaseNode):
 	text: str
 	type: str = 'TEXT_NODE'
@@ -30,7 +32,7 @@ class DOMTextNode(DOMBaseNode):
 		return False
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMElementNode(DOMBaseNode):
 	"""
 	xpath: the xpath of the element from the last root node (shadow root or iframe OR document if no shadow root or iframe).
@@ -45,6 +47,14 @@ class DOMElementNode(DOMBaseNode):
 	is_top_element: bool = False
 	shadow_root: bool = False
 	highlight_index: Optional[int] = None
+	# Id of the node in the in-page extractor, only set for incremental snapshots
+	node_id: Optional[int] = None
+	_hash: Optional[HashedDomElement] = field(default=None, init=False, repr=False, compare=False)
+	# Running hash of the branch path, cached by HistoryTreeProcessor so that descendants
+	# extend it instead of rehashing the whole path
+	_running_branch_path_hash: Optional[int] = field(
+		default=None, init=False, repr=False, compare=False
+	)
 
 	def __repr__(self) -> str:
 		tag_str = f'<{self.tag_name}'
@@ -70,40 +80,51 @@ class DOMElementNode(DOMBaseNode):
 
 		return tag_str
 
-	@cached_property
+	@property
 	def hash(self) -> HashedDomElement:
-		from browser_use.dom.history_tree_processor.service import (
-			HistoryTreeProcessor,
-		)
+		if self._hash is None:
+			from browser_use.dom.history_tree_processor.service import (
+				HistoryTreeProcessor,
+			)
 
-		return HistoryTreeProcessor._hash_dom_element(self)
+			self._hash = HistoryTreeProcessor._hash_dom_element(self)
+		return self._hash
 
 	def get_all_text_till_next_clickable_element(self) -> str:
 		text_parts = []
 
-		def collect_text(node: DOMBaseNode) -> None:
-			# Skip this branch if we hit a highlighted element (except for the current node)
-			if (
-				isinstance(node, DOMElementNode)
-				and node != self
-				and node.highlight_index is not None
-			):
-				return
-
+		# Iterative so that deeply nested pages cannot hit the recursion limit
+		stack: list[DOMBaseNode] = [self]
+		while stack:
+			node = stack.pop()
 			if isinstance(node, DOMTextNode):
 				text_parts.append(node.text)
 			elif isinstance(node, DOMElementNode):
-				for child in node.children:
-					collect_text(child)
+				# Skip this branch if we hit a highlighted element (except for the current node)
+				if node is not self and node.highlight_index is not None:
+					continue
+				stack.extend(reversed(node.children))
 
-		collect_text(self)
 		return '\n'.join(text_parts).strip()
 
 	def clickable_elements_to_string(self, include_attributes: list[str] = []) -> str:
 		"""Convert the processed DOM content to HTML."""
-		formatted_text = []
-
-		def process_node(node: DOMBaseNode, depth: int) -> None:
+		formatted_text: list[str] = []
+		# Highlighted elements get their line once their subtree has been walked:
+		# line position, opening tag, collected text, closing tag
+		highlighted: list[tuple[int, str, list[str], str]] = []
+
+		# Each node carries the text list of its nearest highlighted ancestor, None if there is none.
+		# Text below a highlighted ancestor of this subtree is not part of the output at all.
+		outer_text: Optional[list[str]] = None
+		ancestor = self.parent
+		while ancestor is not None and outer_text is None:
+			if ancestor.highlight_index is not None:
+				outer_text = []
+			ancestor = ancestor.parent
+		stack: list[tuple[DOMBaseNode, Optional[list[str]]]] = [(self, outer_text)]
+		while stack:
+			node, owner_text = stack.pop()
 			if isinstance(node, DOMElementNode):
 				# Add element with highlight_index
 				if node.highlight_index is not None:
@@ -114,20 +135,32 @@ class DOMElementNode(DOMBaseNode):
 							for key, value in node.attributes.items()
 							if key in include_attributes
 						)
-					formatted_text.append(
-						f'{node.highlight_index}[:]<{node.tag_name}{attributes_str}>{node.get_all_text_till_next_clickable_element()}</{node.tag_name}>'
+					owner_text = []
+					highlighted.append(
+						(
+							len(formatted_text),
+							f'{node.highlight_index}[:]<{node.tag_name}{attributes_str}>',
+							owner_text,
+							f'</{node.tag_name}>',
+						)
 					)
+					formatted_text.append('')
 
-				# Process children regardless
-				for child in node.children:
-					process_node(child, depth + 1)
+				# Process children regardless, in document order
+				for child in reversed(node.children):
+					stack.append((child, owner_text))
 
 			elif isinstance(node, DOMTextNode):
 				# Add text only if it doesn't have a highlighted parent
-				if not node.has_parent_with_highlight_index():
+				if owner_text is None:
 					formatted_text.append(f'_[:]{node.text}')
+				else:
+					owner_text.append(node.text)
+
+		for position, opening_tag, text_parts, closing_tag in highlighted:
+			text = '\n'.join(text_parts).strip()
+			formatted_text[position] = f'{opening_tag}{text}{closing_tag}'
 
-		process_node(self, 0)
 		return '\n'.join(formatted_text)
 
 	def get_file_upload_element(self, check_siblings: bool = True) -> Optional['DOMElementNode']:
@@ -179,7 +212,44 @@ class ElementTreeSerializer:
 SelectorMap = dict[int, DOMElementNode]
 
 
+@dataclass(slots=True)
+class HighlightBox:
+	"""Position of a highlighted element in screenshot pixels, relative to the viewport"""
+
+	highlight_index: int
+	left: float
+	top: float
+	width: float
+	height: float
+
+
+@dataclass(slots=True)
+class PageInfo:
+	"""Title and vertical scroll position of the page, read in the same call as the DOM"""
+
+	url: str
+	title: str
+	pixels_above: int
+	pixels_below: int
+
+
 @dataclass
 class DOMState:
 	element_tree: DOMElementNode
 	selector_map: SelectorMap
+	# Interactive elements skipped by viewport-scoped extraction, above and below the viewport
+	offscreen_above: int = field(default=0, kw_only=True)
+	offscreen_below: int = field(default=0, kw_only=True)
+	# Only filled when the extractor was asked for boxes instead of drawing highlights
+	highlight_boxes: list[HighlightBox] = field(default_factory=list, kw_only=True)
+	page_info: Optional[PageInfo] = field(default=None, kw_only=True)
+	_element_index: Optional['DomElementIndex'] = field(default=None, init=False, repr=False)
+
+	@property
+	def element_index(self) -> 'DomElementIndex':
+		"""Hash index of the highlighted elements, built on first use"""
+		if self._element_index is None:
+			from browser_use.dom.history_tree_processor.service import DomElementIndex
+
+			self._element_index = DomElementIndex(self.element_tree)
+		return self._element_index
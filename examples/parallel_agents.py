@@ -6,7 +6,7 @@ import asyncio
 
 from langchain_openai import ChatOpenAI
 
-from browser_use.agent.service import Agent
+from browser_use.agent.runner import AgentRunner
 from browser_use.browser.browser import Browser, BrowserConfig
 from browser_use.browser.context import BrowserContextConfig
 
@@ -15,38 +15,35 @@ browser = Browser(
 		disable_security=True,
 		headless=False,
 		new_context_config=BrowserContextConfig(save_recording_path='./tmp/recordings'),
+		# Contexts are set up ahead of time
+		context_pool_size=4,
 	)
 )
 llm = ChatOpenAI(model='gpt-4o')
 
 
 async def main():
-	agents = [
-		Agent(task=task, llm=llm, browser=browser)
-		for task in [
-			'Search Google for weather in Tokyo',
-			'Check Reddit front page title',
-			'Look up Bitcoin price on Coinbase',
-			'Find NASA image of the day',
-			# 'Check top story on CNN',
-			# 'Search latest SpaceX launch date',
-			# 'Look up population of Paris',
-			# 'Find current time in Sydney',
-			# 'Check who won last Super Bowl',
-			# 'Search trending topics on Twitter',
-		]
+	tasks = [
+		'Search Google for weather in Tokyo',
+		'Check Reddit front page title',
+		'Look up Bitcoin price on Coinbase',
+		'Find NASA image of the day',
+		'Check top story on CNN',
+		'Search latest SpaceX launch date',
+		'Look up population of Paris',
+		'Find current time in Sydney',
+		'Check who won last Super Bowl',
+		'Search trending topics on Twitter',
 	]
 
-	await asyncio.gather(*[agent.run() for agent in agents])
-
-	# async with await browser.new_context() as context:
-	agentX = Agent(
-		task='Go to apple.com and return the title of the page',
-		llm=llm,
-		browser=browser,
-		# browser_context=context,
+	# At most 4 agents at a time, each task gets 5 minutes. The tasks may share origin storage,
+	# so their contexts are reset and reused instead of closed.
+	runner = AgentRunner(
+		llm=llm, browser=browser, max_concurrency=4, task_timeout=300, reuse_contexts=True
 	)
-	await agentX.run()
+	async for result in runner.run(tasks):
+		outcome = result.error or result.history.final_result()
+		print(f'{result.task} ({result.duration:.0f}s): {outcome}')
 
 	await browser.close()
 
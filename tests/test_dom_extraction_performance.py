@@ -0,0 +1,79 @@
+"""
+Timing of the DOM extraction on a large generated page.
+
+Prints the in-page counters of buildDomTree.js and end-to-end extraction times,
+run with `pytest -s -m slow`.
+"""
+
+import time
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.dom.service import DomService
+
+
+def generate_fixture(n_elements: int) -> str:
+	rows = []
+	for i in range(n_elements // 4):
+		hidden = ' style="display: none"' if i % 10 == 0 else ''
+		rows.append(
+			f'<div class="row"{hidden}><span>Item {i}</span>'
+			f'<a href="/item/{i}">Open</a><button>Add {i}</button></div>'
+		)
+	return f'<html><body><main>{"".join(rows)}</main></body></html>'
+
+
+@pytest.fixture
+async def browser():
+	browser = Browser(config=BrowserConfig(headless=True))
+	yield browser
+	await browser.close()
+
+
+@pytest.mark.slow
+async def test_extraction_timings_20k_elements(browser):
+	async with await browser.new_context() as context:
+		page = await context.get_current_page()
+		await page.set_content(generate_fixture(20_000))
+
+		dom_service = DomService(page)
+		dom_state = await dom_service.get_clickable_elements(highlight_elements=True)
+		timings = await dom_service.get_extraction_timings()
+
+		print(f'\nExtraction timings: {timings}')
+		assert timings is not None
+		assert timings['elements'] >= 20_000
+		# Only interactive and visible elements are hit tested
+		assert timings['topChecks'] < timings['elements']
+		assert timings['highlights'] == len(dom_state.selector_map)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('n_elements', [5_000, 30_000])
+async def test_json_transport_benchmark(browser, n_elements):
+	async with await browser.new_context() as context:
+		page = await context.get_current_page()
+		await page.set_content(generate_fixture(n_elements))
+		dom_service = DomService(page)
+
+		timings = {}
+		states = {}
+		for json_transport in (False, True):
+			# First call installs the extractor and warms up the JIT
+			await dom_service.get_clickable_elements(
+				highlight_elements=False, json_transport=json_transport
+			)
+			start = time.perf_counter()
+			for _ in range(3):
+				states[json_transport] = await dom_service.get_clickable_elements(
+					highlight_elements=False, json_transport=json_transport
+				)
+			timings[json_transport] = (time.perf_counter() - start) / 3
+
+		print(
+			f'\n{n_elements} elements: object transport {timings[False] * 1000:.0f} ms, '
+			f'JSON transport {timings[True] * 1000:.0f} ms'
+		)
+		assert states[True].selector_map.keys() == states[False].selector_map.keys()
+		assert repr(states[True].element_tree) == repr(states[False].element_tree)
@@ -0,0 +1,113 @@
+"""
+XPaths built top-down during the walk of buildDomTree.js must stay byte-identical to the ones
+of the bottom-up getXPathTree they replaced, which replay and the CSS selector conversion
+depend on. Run with `pytest -m slow`.
+"""
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.dom.service import DomService
+
+# getXPathTree as it was before XPaths were built during the walk, applied to every element
+# the extraction highlighted
+REFERENCE_XPATHS_JS = """
+() => {
+	function getXPathTree(element, stopAtBoundary = true) {
+		const segments = [];
+		let currentElement = element;
+
+		while (currentElement && currentElement.nodeType === Node.ELEMENT_NODE) {
+			if (stopAtBoundary && (currentElement.parentNode instanceof ShadowRoot || currentElement.parentNode instanceof HTMLIFrameElement)) {
+				break;
+			}
+
+			let index = 0;
+			let sibling = currentElement.previousSibling;
+			while (sibling) {
+				if (sibling.nodeType === Node.ELEMENT_NODE &&
+					sibling.nodeName === currentElement.nodeName) {
+					index++;
+				}
+				sibling = sibling.previousSibling;
+			}
+
+			const tagName = currentElement.nodeName.toLowerCase();
+			const xpathIndex = index > 0 ? `[${index + 1}]` : '';
+			segments.unshift(`${tagName}${xpathIndex}`);
+
+			currentElement = currentElement.parentNode;
+		}
+
+		return segments.join('/');
+	}
+
+	const xpaths = {};
+	function collect(root) {
+		for (const element of root.querySelectorAll('[browser-user-highlight-id]')) {
+			const index = element.getAttribute('browser-user-highlight-id').replace('playwright-highlight-', '');
+			xpaths[index] = getXPathTree(element);
+		}
+		for (const element of root.querySelectorAll('*')) {
+			if (element.shadowRoot) collect(element.shadowRoot);
+			if (element.tagName === 'IFRAME' && element.contentDocument) collect(element.contentDocument);
+		}
+	}
+	collect(document);
+	return xpaths;
+}
+"""
+
+
+def generate_fixture(n_items: int) -> str:
+	# Siblings of the same and of other tags, so that every per-tag counter is exercised
+	items = ''.join(
+		f'<li><span>Item {i}</span><a href="/item/{i}">Open</a><a href="/item/{i}/buy">Buy</a></li>'
+		for i in range(n_items)
+	)
+	iframe = '<form><input name="card"><input name="expiry"><button>Pay</button></form>'
+	return f"""
+		<html><body>
+			<nav><a href="/">Home</a><a href="/cart">Cart</a></nav>
+			<ul>{items}</ul>
+			<div id="host"></div>
+			<div><button>Outside</button><div id="nested-host"></div></div>
+			<iframe srcdoc='{iframe}'></iframe>
+			<script>
+				const root = document.getElementById('host').attachShadow({{ mode: 'open' }});
+				root.innerHTML = '<div><button>One</button><button>Two</button></div><a href="/shadow">Link</a>';
+				const nested = document.getElementById('nested-host').attachShadow({{ mode: 'open' }});
+				nested.innerHTML = '<p><button>Deep</button></p><p><button>Deeper</button></p>';
+			</script>
+		</body></html>
+	"""
+
+
+@pytest.fixture
+async def browser():
+	browser = Browser(config=BrowserConfig(headless=True))
+	yield browser
+	await browser.close()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('flat', [False, True])
+async def test_xpaths_match_get_xpath_tree(browser, flat):
+	async with await browser.new_context() as context:
+		page = await context.get_current_page()
+		await page.set_content(generate_fixture(2_000))
+
+		dom_state = await DomService(page).get_clickable_elements(
+			highlight_elements=True, flat=flat
+		)
+		reference = await page.evaluate(REFERENCE_XPATHS_JS)
+
+		xpaths = {index: node.xpath for index, node in dom_state.selector_map.items()}
+		# Wide list, both shadow roots and the iframe all took part
+		assert len(xpaths) > 4_000
+		assert {node.tag_name for node in dom_state.selector_map.values()} >= {
+			'a',
+			'button',
+			'input',
+		}
+		assert xpaths == {int(index): xpath for index, xpath in reference.items()}